@@ -0,0 +1,61 @@
+"""
+Tracker cost per frame in crowded scenes, with and without grid gating.
+
+Synthetic pedestrians (boxes 15-60 px) walk through a scene whose area
+grows with their number, so the crowd density stays fixed as in a
+busier or wider camera view.  Each matcher runs once on the full IoU
+matrix and once with ``grid_gating``; both must assign every frame's
+detections to the same track IDs.  Cost per object that stays flat as the
+crowd grows means linear scaling.  Run from the repository root:
+
+    python -m benchmarks.bench_crowd_tracking --objects 250 500 1000 2000
+"""
+
+import argparse
+import dataclasses
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.cctv_analyzer.config import ObjectTrackerConfig
+from src.cctv_analyzer.core.object_tracker import ObjectTracker
+
+from .bench_tracker import make_frames
+
+
+def run(config: ObjectTrackerConfig, frames: List[List[Dict]]):
+    tracker = ObjectTracker(config)
+    assignments = []
+    t0 = time.perf_counter()
+    for idx, dets in enumerate(frames):
+        tracks = tracker.update(dets, idx / 25, idx)
+        assignments.append({obj_id: track["gt"] for obj_id, track in tracks.items()})
+    return (time.perf_counter() - t0) / len(frames) * 1e3, assignments
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--objects", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--density", type=float, default=400.0, help="Objects per megapixel")
+    ap.add_argument("--matching", nargs="+", default=["greedy", "hungarian"])
+    ns = ap.parse_args()
+
+    print("  objects  matching     dense ms  gated ms  speedup  gated us/object")
+    for n_objects in ns.objects:
+        side = float(np.sqrt(n_objects / ns.density * 1e6))
+        frames = make_frames(n_objects, ns.frames, frame=(side, side), sizes=(15, 60))
+        for matching in ns.matching:
+            config = ObjectTrackerConfig(matching=matching, grid_gating=False)
+            dense_ms, dense = run(config, frames)
+            gated_ms, gated = run(dataclasses.replace(config, grid_gating=True), frames)
+            assert dense == gated, f"{matching}: gating changed the assignments"
+            print(
+                f"  {n_objects:7d}  {matching:<10s}  {dense_ms:9.2f}  {gated_ms:8.2f}"
+                f"  {dense_ms / gated_ms:6.1f}x  {gated_ms / n_objects * 1e3:15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
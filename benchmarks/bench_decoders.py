@@ -0,0 +1,62 @@
+"""
+Decoder backend comparison: OpenCV VideoCapture vs. ffmpeg rawvideo pipe.
+
+Each backend decodes the whole file at full size, scaled to a 640 px wide
+proxy, and as a grayscale proxy.  Run from the repository root:
+
+    python -m benchmarks.bench_decoders --seconds 30
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_video, transcode
+from src.cctv_analyzer.core.decoders import open_decoder
+
+
+def run(video: str, backend: str, size, gray: bool, threads: int) -> float:
+    t0 = time.perf_counter()
+    with open_decoder(video, backend, size=size, gray=gray, threads=threads) as dec:
+        n = 0
+        while dec.read()[0]:
+            n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--threads", type=int, default=0)
+    ap.add_argument("--video", nargs="*", help="Benchmark these files instead")
+    ns = ap.parse_args()
+
+    proxy = (640, int(round(640 * ns.height / ns.width)))
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = ns.video
+        if not videos:
+            mjpeg = make_synthetic_video(
+                os.path.join(tmp, "mjpeg.avi"),
+                seconds=ns.seconds,
+                size=(ns.width, ns.height),
+            )
+            videos = [mjpeg, transcode(mjpeg, os.path.join(tmp, "h264.mp4"))]
+
+        print(f"{'input':>10} {'backend':>8} {'output':>14} {'fps':>8}")
+        for video in videos:
+            for backend in ("opencv", "ffmpeg"):
+                for label, size, gray in (
+                    ("full bgr", None, False),
+                    ("proxy bgr", proxy, False),
+                    ("proxy gray", proxy, True),
+                ):
+                    fps = run(video, backend, size, gray, ns.threads)
+                    name = os.path.basename(video)[:10]
+                    print(f"{name:>10} {backend:>8} {label:>14} {fps:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Detector calls saved by frame deduplication against the similarity
+threshold.
+
+The synthetic recording mimics a DVR export: every distinct frame is
+repeated ``--repeat`` times, the scene is idle for the second half, and
+each stored frame gets fresh sensor noise and JPEG coding, so repeats are
+not bit-identical.
+A frame wrongly treated as a duplicate (its content differs from the last
+detected frame) counts as a miss.  Only the gate runs, no model.  Run from
+the repository root:
+
+    python -m benchmarks.bench_dedup --repeat 4 --thresholds 0 3 6 12 20
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks._synthetic import synthetic_frames
+from src.cctv_analyzer.config import ObjectDetectorConfig
+from src.cctv_analyzer.core.detection_gate import DetectionGate
+
+
+def recording(n_distinct: int, repeat: int, size, noise: float, quality: int):
+    """(frame, content id) pairs; frames sharing an id show the same scene."""
+    rng = np.random.default_rng(0)
+    moving = list(synthetic_frames(n_distinct // 2, size=size, n_objects=3))
+    idle = [moving[-1]] * (n_distinct - len(moving))
+    out = []
+    for content, frame in enumerate(moving + idle):
+        content = min(content, len(moving) - 1)
+        for _ in range(repeat):
+            noisy = np.clip(frame + rng.normal(0, noise, frame.shape), 0, 255).astype(np.uint8)
+            ok, jpg = cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            out.append((cv2.imdecode(jpg, cv2.IMREAD_COLOR), content))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--distinct", type=int, default=100)
+    ap.add_argument("--repeat", type=int, default=4)
+    ap.add_argument("--size", default="640x360", help="Proxy frame size")
+    ap.add_argument("--noise", type=float, default=3.0, help="Sensor noise std")
+    ap.add_argument("--quality", type=int, default=85, help="JPEG quality of stored frames")
+    ap.add_argument("--thresholds", type=float, nargs="+", default=[0, 3, 6, 12, 20])
+    ns = ap.parse_args()
+
+    size = tuple(int(v) for v in ns.size.split("x"))
+    frames = recording(ns.distinct, ns.repeat, size, ns.noise, ns.quality)
+    print(f"{len(frames)} frames, {ns.distinct // 2} distinct scenes, then idle")
+    print("  threshold   detector calls   saved   missed changes   us/frame")
+    for threshold in ns.thresholds:
+        gate = DetectionGate(
+            ObjectDetectorConfig(dedup_frames=True, dedup_threshold=threshold)
+        )
+        detected_content = None
+        missed = 0
+        t0 = time.perf_counter()
+        for frame, content in frames:
+            gate.should_detect(1.0)
+            if gate.is_duplicate(frame):
+                missed += content != detected_content
+            else:
+                detected_content = content
+        per_frame = (time.perf_counter() - t0) / len(frames) * 1e6
+        stats = gate.stats
+        print(
+            f"  {threshold:9.1f}   {stats['detector_calls']:14d}   {stats['dedup_calls_saved']:5d}"
+            f"   {missed:14d}   {per_frame:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Detector calls and event recall when the detector runs only every K-th
+frame and optical flow carries the boxes in between.
+
+Events found with K = 1 are the reference; an event counts as recalled
+when one of the same type lies within ``--tolerance`` seconds.  By
+default the synthetic objects are found by a colour-keyed stand-in
+detector, so no model weights are needed; pass ``--model`` and
+``--backend`` to use a real one.  Run from the repository root:
+
+    python -m benchmarks.bench_detect_interval --intervals 1 2 3 5 10
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks._synthetic import SyntheticObjectBackend, make_synthetic_video
+from src.cctv_analyzer.config import (
+    CameraConfig,
+    EventAnalyzerConfig,
+    MotionDetectorConfig,
+    ObjectDetectorConfig,
+    ObjectTrackerConfig,
+    VideoConfig,
+)
+from src.cctv_analyzer.core.event_analyzer import EventAnalyzer
+from src.cctv_analyzer.core.inference_backends import BACKENDS
+from src.cctv_analyzer.core.motion_detector import MotionDetector
+from src.cctv_analyzer.pipeline import analyse_range
+
+BACKENDS["synthetic"] = SyntheticObjectBackend
+
+
+def recall(events, reference, tolerance: float) -> float:
+    if not reference:
+        return 1.0
+    found = sum(
+        any(e.type == r.type and abs(e.timestamp - r.timestamp) <= tolerance for e in events)
+        for r in reference
+    )
+    return found / len(reference)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--intervals", type=int, nargs="+", default=[1, 2, 3, 5, 10])
+    ap.add_argument("--skip-frames", type=int, default=3)
+    ap.add_argument("--model", default="")
+    ap.add_argument("--backend", default="synthetic")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--tolerance", type=float, default=1.0, help="Event match window, s")
+    ap.add_argument("--video", help="Use an existing video instead of a synthetic one")
+    ns = ap.parse_args()
+
+    size = tuple(int(v) for v in ns.size.split("x"))
+    motion_cfg = MotionDetectorConfig()
+    with tempfile.TemporaryDirectory() as tmp:
+        video = ns.video or make_synthetic_video(
+            os.path.join(tmp, "synthetic.avi"), seconds=ns.seconds, size=size, textured=True
+        )
+        reference = None
+        print("  K   detector calls   propagated   re-detected   detect s   flow s   tracks   events   recall")
+        for interval in ns.intervals:
+            analysis = analyse_range(
+                video,
+                video_cfg=VideoConfig(),
+                camera_cfg=CameraConfig(),
+                motion_cfg=motion_cfg,
+                objdet_cfg=ObjectDetectorConfig(
+                    model=ns.model,
+                    backend=ns.backend,
+                    device=ns.device,
+                    detect_interval=interval,
+                ),
+                tracker_cfg=ObjectTrackerConfig(),
+                skip_frames=ns.skip_frames,
+            )
+            events = EventAnalyzer(EventAnalyzerConfig()).analyze_events(
+                MotionDetector(motion_cfg).summarize(analysis["motion_scores"]),
+                analysis["tracked_history"],
+                analysis["timestamps"],
+                analysis["fps"],
+            )
+            if reference is None:
+                reference = events
+            stats, seconds = analysis["detection"], analysis["stage_seconds"]
+            print(
+                f"  {interval:<3d} {stats['detector_calls']:14d}   {stats['propagated_frames']:10d}"
+                f"   {stats['redetections']:11d}   {seconds.get('detection', 0.0):8.2f}"
+                f"   {seconds.get('propagation', 0.0):6.2f}   {len(analysis['tracked_history']):6d}"
+                f"   {len(events):6d}   {recall(events, reference, ns.tolerance):6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Detection post-processing cost per frame against the number of boxes.
+
+Synthetic Ultralytics results (no inference) are parsed, class-filtered
+and mapped to source pixels three ways: one box at a time (``box.xyxy[0]
+.cpu().numpy()`` per box), per-frame tensors converted once but filtered
+and scaled per box in Python, and the columnar ``DetectionBatch`` path
+used by the pipeline.  Run from the repository root:
+
+    python -m benchmarks.bench_detection_parsing --boxes 10 100 300 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+from src.cctv_analyzer.core.video_utils import FrameScale
+from src.cctv_analyzer.models.detection_models import DetectionBatch
+
+NAMES = {i: f"class{i}" for i in range(80)}
+RELEVANT = {f"class{i}" for i in range(0, 80, 2)}
+RELEVANT_IDS = np.array([i for i, n in NAMES.items() if n in RELEVANT], np.int32)
+
+
+def make_results(n_frames: int, n_boxes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    image = np.zeros((360, 640, 3), np.uint8)
+    results = []
+    for _ in range(n_frames):
+        xy = rng.uniform(0, 600, (n_boxes, 2))
+        wh = rng.uniform(5, 40, (n_boxes, 2))
+        data = np.column_stack(
+            [xy, xy + wh, rng.uniform(0.25, 1, n_boxes), rng.integers(0, 80, n_boxes)]
+        )
+        results.append(Results(image, "", NAMES, boxes=torch.tensor(data, dtype=torch.float32)))
+    return results
+
+
+def to_source(det, scale):
+    """Per-dict mapping to source px, as the per-box paths used to do."""
+    x1, y1, x2, y2 = det["bbox"]
+    return dict(
+        det,
+        bbox=[x1 * scale.sx, y1 * scale.sy, x2 * scale.sx, y2 * scale.sy],
+        area=det["area"] * scale.area_factor,
+    )
+
+
+def per_box(results, scale):
+    out = []
+    for result in results:
+        frame = []
+        for box in result.boxes:
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+            confidence = float(box.conf[0].cpu().numpy())
+            class_id = int(box.cls[0].cpu().numpy())
+            if NAMES[class_id] in RELEVANT:
+                det = {
+                    "bbox": [float(x1), float(y1), float(x2), float(y2)],
+                    "confidence": confidence,
+                    "class": NAMES[class_id],
+                    "class_id": class_id,
+                    "area": (x2 - x1) * (y2 - y1),
+                }
+                frame.append(to_source(det, scale))
+        out.append(frame)
+    return out
+
+
+def per_frame(results, scale):
+    out = []
+    for result in results:
+        boxes = result.boxes
+        xyxy = boxes.xyxy.cpu().numpy()
+        confs = boxes.conf.cpu().numpy()
+        class_ids = boxes.cls.cpu().numpy().astype(int)
+        frame = []
+        for (x1, y1, x2, y2), confidence, class_id in zip(xyxy, confs, class_ids):
+            if NAMES[class_id] in RELEVANT:
+                det = {
+                    "bbox": [float(x1), float(y1), float(x2), float(y2)],
+                    "confidence": float(confidence),
+                    "class": NAMES[class_id],
+                    "class_id": int(class_id),
+                    "area": (x2 - x1) * (y2 - y1),
+                }
+                frame.append(to_source(det, scale))
+        out.append(frame)
+    return out
+
+
+def columnar(results, scale):
+    batch = DetectionBatch.concat(
+        [
+            DetectionBatch.from_array(r.boxes.data.cpu().numpy(), i, NAMES)
+            for i, r in enumerate(results)
+        ]
+    )
+    return scale.batch_to_source(batch.with_classes(RELEVANT_IDS))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--boxes", type=int, nargs="+", default=[10, 100, 300, 1000])
+    ap.add_argument("--frames", type=int, default=50)
+    ns = ap.parse_args()
+
+    scale = FrameScale.fit((1920, 1080), (640, 360))
+    print(f"{ns.frames} frames, half of 80 classes relevant, proxy -> 1920x1080")
+    print("  boxes   per-box ms   per-frame ms   columnar ms   speedup vs per-box")
+    for n_boxes in ns.boxes:
+        results = make_results(ns.frames, n_boxes)
+        timings = []
+        for fn in (per_box, per_frame, columnar):
+            fn(results[:2], scale)  # warm-up
+            t0 = time.perf_counter()
+            out = fn(results, scale)
+            timings.append((time.perf_counter() - t0) / ns.frames * 1e3)
+        kept = sum(len(f) for f in per_box(results, scale))
+        assert kept == len(out), (kept, len(out))
+        print(
+            f"  {n_boxes:5d}   {timings[0]:10.3f}   {timings[1]:12.3f}"
+            f"   {timings[2]:11.3f}   {timings[0] / timings[2]:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Object detector throughput (frames/s) against batch size.
+
+Frames are synthesised in memory at the analysis proxy size, so only
+pre-processing, inference and post-processing are timed.  Run from the
+repository root:
+
+    python -m benchmarks.bench_detector_batch --device cpu --batch-sizes 1 2 4 8 16
+"""
+
+import argparse
+import time
+
+from benchmarks._synthetic import synthetic_frames
+from src.cctv_analyzer.config import ObjectDetectorConfig
+from src.cctv_analyzer.core.object_detector import ObjectDetector
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--model", default="yolov8n.pt")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--frames", type=int, default=64)
+    ap.add_argument("--size", default="640x360", help="Proxy frame size")
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    ns = ap.parse_args()
+
+    size = tuple(int(v) for v in ns.size.split("x"))
+    frames = list(synthetic_frames(ns.frames, size=size, n_objects=4))
+
+    reference = None
+    print(f"{ns.model} on {ns.device}, {len(frames)} frames of {size[0]}x{size[1]}")
+    print("  batch   frames/s   ms/frame   same detections as batch 1")
+    for batch_size in ns.batch_sizes:
+        detector = ObjectDetector(
+            ObjectDetectorConfig(model=ns.model, device=ns.device, batch_size=batch_size)
+        )
+        detector.detect_objects(frames[: batch_size * 2])  # warm-up
+        t0 = time.perf_counter()
+        detections = detector.detect_objects(frames)
+        wall = time.perf_counter() - t0
+
+        counts = [len(d) for d in detections]
+        if reference is None:
+            reference = counts
+        print(
+            f"  {batch_size:5d}   {len(frames) / wall:8.1f}   {wall / len(frames) * 1e3:8.1f}"
+            f"   {'yes' if counts == reference else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+CPU inference latency and throughput of the detector backends.
+
+Each backend runs the same weights on synthetic proxy-size frames: latency
+is the median time of a single-frame call, throughput the frame rate of
+``--batch``-frame calls.  Detections are compared with the first backend.
+The one-time ONNX export happens before timing.  Run from the repository
+root:
+
+    python -m benchmarks.bench_inference_backends --backends ultralytics onnxruntime opencv
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks._synthetic import synthetic_frames
+from src.cctv_analyzer.core.inference_backends import onnx_model, open_backend
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--model", default="yolov8n.pt")
+    ap.add_argument(
+        "--backends", nargs="+", default=["ultralytics", "onnxruntime", "opencv"]
+    )
+    ap.add_argument("--frames", type=int, default=32)
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--size", default="640x360", help="Proxy frame size")
+    ap.add_argument("--conf", type=float, default=0.25)
+    ns = ap.parse_args()
+
+    size = tuple(int(v) for v in ns.size.split("x"))
+    frames = list(synthetic_frames(ns.frames, size=size, n_objects=4))
+    onnx_model(ns.model)
+
+    print(f"{ns.model}, {len(frames)} frames of {size[0]}x{size[1]}, {cv2.getNumThreads()} threads")
+    print(f"  backend        load s   latency ms   batch-{ns.batch} frames/s   same boxes")
+    reference = None
+    for name in ns.backends:
+        t0 = time.perf_counter()
+        backend = open_backend(name, ns.model, device="cpu", conf=ns.conf)
+        load = time.perf_counter() - t0
+        backend.predict(frames[:1])  # warm-up
+
+        latencies = []
+        for frame in frames:
+            t0 = time.perf_counter()
+            backend.predict([frame])
+            latencies.append(time.perf_counter() - t0)
+
+        outputs = []
+        t0 = time.perf_counter()
+        for i in range(0, len(frames), ns.batch):
+            outputs.extend(backend.predict(frames[i : i + ns.batch]))
+        throughput = len(frames) / (time.perf_counter() - t0)
+
+        if reference is None:
+            reference = outputs
+        same = all(
+            len(a) == len(b) and np.allclose(a, b, atol=0.5)
+            for a, b in zip(reference, outputs)
+        )
+        print(
+            f"  {name:12s}  {load:7.2f}   {np.median(latencies) * 1e3:10.1f}"
+            f"   {throughput:17.1f}   {'yes' if same else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Chunk-parallel analysis: wall time and agreement with the serial run at
+1/2/4/8 worker processes.
+
+Motion, detection and tracking run on a synthetic H.264 recording; the
+stitched result is compared with the serial one (motion scores, track
+count, event count).  Run from the repository root:
+
+    python -m benchmarks.bench_parallel --seconds 600 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._synthetic import make_synthetic_video, transcode
+from src.cctv_analyzer.config import (
+    CameraConfig,
+    EventAnalyzerConfig,
+    MotionDetectorConfig,
+    ObjectDetectorConfig,
+    ObjectTrackerConfig,
+    VideoConfig,
+)
+from src.cctv_analyzer.core.event_analyzer import EventAnalyzer
+from src.cctv_analyzer.core.keyframe_index import load_or_build_index
+from src.cctv_analyzer.core.motion_detector import MotionDetector
+from src.cctv_analyzer.parallel import analyse_parallel
+from src.cctv_analyzer.pipeline import analyse_range
+
+
+def run(video: str, index, workers: int, ns):
+    motion_cfg = MotionDetectorConfig()
+    kwargs = dict(
+        video_cfg=VideoConfig(workers=workers, chunk_overlap_seconds=ns.overlap),
+        camera_cfg=CameraConfig(),
+        motion_cfg=motion_cfg,
+        objdet_cfg=ObjectDetectorConfig(model=ns.model, device=ns.device),
+        tracker_cfg=ObjectTrackerConfig(),
+        skip_frames=ns.skip_frames,
+        index=index,
+    )
+    t0 = time.perf_counter()
+    if workers == 1:
+        analysis = analyse_range(video, **kwargs)
+    else:
+        analysis = analyse_parallel(video, **kwargs)
+    wall = time.perf_counter() - t0
+
+    events = EventAnalyzer(EventAnalyzerConfig()).analyze_events(
+        MotionDetector(motion_cfg).summarize(analysis["motion_scores"]),
+        analysis["tracked_history"],
+        analysis["timestamps"],
+        analysis["fps"],
+    )
+    return wall, analysis, events
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=300.0)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--gop", type=int, default=50)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--overlap", type=float, default=10.0, help="Warm-up seconds")
+    ap.add_argument("--skip-frames", type=int, default=2)
+    ap.add_argument("--model", default="yolov8n.pt")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--video", help="Use an existing video instead of a synthetic one")
+    ns = ap.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        video = ns.video
+        if not video:
+            raw = make_synthetic_video(
+                os.path.join(tmp, "synthetic.avi"),
+                seconds=ns.seconds,
+                size=(ns.width, ns.height),
+            )
+            video = transcode(raw, os.path.join(tmp, "synthetic.mp4"), gop=ns.gop)
+        index = load_or_build_index(video)
+
+        baseline = None
+        for workers in ns.workers:
+            wall, analysis, events = run(video, index, workers, ns)
+            n = len(analysis["timestamps"])
+            line = (
+                f"workers={workers:<2} {wall:7.1f} s  {n / wall:6.1f} frames/s  "
+                f"tracks {len(analysis['tracked_history']):4d}  events {len(events):4d}"
+            )
+            if baseline is None:
+                baseline = (wall, np.asarray(analysis["motion_scores"]))
+            else:
+                diff = np.abs(np.asarray(analysis["motion_scores"]) - baseline[1])
+                line += (
+                    f"  speedup {baseline[0] / wall:4.2f}x"
+                    f"  score diff max {diff.max():.4f}"
+                    f" ({np.count_nonzero(diff > 1e-6)} frames)"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
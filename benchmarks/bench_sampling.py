@@ -0,0 +1,84 @@
+"""
+Sampling throughput: read-all vs. grab-skip vs. seek-sample.
+
+``seek-indexed`` seeks through a keyframe index (keyframe + bounded
+decode-forward) instead of relying on the backend's own seek.
+
+``read-all`` reproduces the old behaviour (``cap.read()`` on every frame,
+discarding the unsampled ones).  Run from the repository root:
+
+    python -m benchmarks.bench_sampling --seconds 120 --strides 3 10 25
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+
+from benchmarks._synthetic import make_synthetic_video, transcode
+from src.cctv_analyzer.core import video_utils
+from src.cctv_analyzer.core.keyframe_index import load_or_build_index
+
+
+def read_all(video: str, stride: int) -> int:
+    cap = cv2.VideoCapture(video)
+    n = idx = 0
+    while True:
+        ret, _ = cap.read()
+        if not ret:
+            break
+        if idx % stride == 0:
+            n += 1
+        idx += 1
+    cap.release()
+    return n
+
+
+def via_source(video: str, stride: int, seek: bool, index=None) -> int:
+    source = video_utils.FrameSource(
+        video, skip_frames=stride - 1, seek=seek, index=index
+    )
+    return sum(1 for _ in source)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--gop", type=int, default=50, help="Keyframe interval of the test file")
+    ap.add_argument("--strides", type=int, nargs="+", default=[3, 10, 25, 100])
+    ap.add_argument("--video", help="Use an existing video instead of a synthetic one")
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = ns.video
+        if not video:
+            raw = make_synthetic_video(
+                os.path.join(tmp, "raw.avi"),
+                seconds=ns.seconds,
+                size=(ns.width, ns.height),
+            )
+            video = transcode(raw, os.path.join(tmp, "h264.mp4"), gop=ns.gop)
+
+        index = load_or_build_index(video)
+        probe = video_utils.FrameSource(video)
+        duration = probe.frame_count / probe.fps
+        print(f"{'stride':>6} {'mode':>13} {'samples':>8} {'seconds':>8} {'x realtime':>11}")
+        for stride in ns.strides:
+            for name, fn in (
+                ("read-all", lambda: read_all(video, stride)),
+                ("grab-skip", lambda: via_source(video, stride, seek=False)),
+                ("seek-sample", lambda: via_source(video, stride, seek=True)),
+                ("seek-indexed", lambda: via_source(video, stride, True, index)),
+            ):
+                t0 = time.perf_counter()
+                n = fn()
+                dt = time.perf_counter() - t0
+                print(f"{stride:>6} {name:>13} {n:>8} {dt:>8.2f} {duration / dt:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Peak-memory benchmark: materialised frame list vs. streaming frame source.
+
+Each mode runs in its own interpreter so the RSS figures do not leak into
+each other.  Run from the repository root:
+
+    python -m benchmarks.bench_streaming_memory --seconds 300
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._synthetic import make_synthetic_video
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MiB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(mode: str, video: str, skip_frames: int) -> None:
+    from src.cctv_analyzer.config import MotionDetectorConfig
+    from src.cctv_analyzer.core import video_utils
+    from src.cctv_analyzer.core.motion_detector import MotionDetector
+
+    motion = MotionDetector(MotionDetectorConfig())
+    samples = []
+    if mode == "list":
+        frames, _, _ = video_utils.extract_frames(video, skip_frames=skip_frames)
+        for i, frame in enumerate(frames):
+            motion.process_frame(frame)
+            if i % 250 == 0:
+                samples.append((i, _rss_mb()))
+    else:
+        for i, (_, _, frame) in enumerate(
+            video_utils.FrameSource(video, skip_frames=skip_frames)
+        ):
+            motion.process_frame(frame)
+            if i % 250 == 0:
+                samples.append((i, _rss_mb()))
+
+    peak = max(rss for _, rss in samples)
+    trace = "  ".join(f"{i}:{rss:.0f}" for i, rss in samples[:: max(1, len(samples) // 8)])
+    print(f"{mode:>6}  peak RSS {peak:8.1f} MiB   frame:RSS  {trace}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=120.0)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--skip-frames", type=int, default=0)
+    ap.add_argument("--video", help="Use an existing video instead of a synthetic one")
+    ap.add_argument("--mode", choices=["list", "stream"], help=argparse.SUPPRESS)
+    ns = ap.parse_args()
+
+    if ns.mode:
+        _run_mode(ns.mode, ns.video, ns.skip_frames)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = ns.video or make_synthetic_video(
+            os.path.join(tmp, "synthetic.avi"),
+            seconds=ns.seconds,
+            size=(ns.width, ns.height),
+        )
+        for mode in ("stream", "list"):
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.bench_streaming_memory",
+                    "--mode", mode, "--video", video,
+                    "--skip-frames", str(ns.skip_frames),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Motion-score error at the start of a run: empty background model vs. one
+primed from the background saved by a previous run.
+
+The scene has a known amount of real motion (one walking figure) and a
+noisy "foliage" area, so every point of score above that is spurious.
+Run from the repository root:
+
+    python -m benchmarks.bench_warm_start --algorithm MOG2
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from src.cctv_analyzer.config import MotionDetectorConfig
+from src.cctv_analyzer.core.motion_detector import MotionDetector
+
+
+def scene(n_frames: int, size, seed: int, start_x: int):
+    """Frames plus the true motion score of each."""
+    width, height = size
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(
+        rng.integers(60, 160, (height, width, 3), dtype=np.uint8), (0, 0), 3
+    ).astype(np.float32)
+    sigma = np.full((height, width, 1), 3.0, np.float32)
+    sigma[: height // 2, : width // 3] = 14.0  # foliage
+
+    rng = np.random.default_rng(seed)
+    x, y, fw, fh = start_x, height // 2, width // 20, height // 6
+    frames = []
+    for _ in range(n_frames):
+        frame = background + rng.standard_normal(background.shape, np.float32) * sigma
+        x = (x + 4) % (width - fw)
+        frame[y : y + fh, x : x + fw] = 40
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames, fw * fh / (width * height)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--algorithm", default="MOG2")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--size", default="640x360")
+    ns = ap.parse_args()
+
+    size = tuple(int(v) for v in ns.size.split("x"))
+    cfg = MotionDetectorConfig(algorithm=ns.algorithm, min_area=50, background_dir="-")
+
+    previous = MotionDetector(cfg)
+    for frame in scene(cfg.history, size, seed=1, start_x=0)[0]:
+        previous.score_frame(frame)
+    saved = previous.snapshot()
+
+    frames, truth = scene(ns.frames, size, seed=2, start_x=size[0] // 2)
+    fresh = MotionDetector(cfg)
+    primed = MotionDetector(cfg)
+    t0 = time.perf_counter()
+    primed.prime(saved)
+    prime_ms = (time.perf_counter() - t0) * 1e3
+
+    cold = np.array([fresh.score_frame(f) for f in frames])
+    warm = np.array([primed.score_frame(f) for f in frames])
+    print(f"{ns.algorithm} {size[0]}x{size[1]}, true score {truth:.4f}, priming {prime_ms:.0f} ms")
+    print("  frames      mean |score - true|   empty model   primed")
+    for lo, hi in ((0, 10), (10, 30), (30, 100), (100, ns.frames)):
+        print(
+            f"  {lo:4d}-{hi:<4d}                      "
+            f"{np.abs(cold[lo:hi] - truth).mean():9.4f}  {np.abs(warm[lo:hi] - truth).mean():7.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
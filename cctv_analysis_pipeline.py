@@ -12,6 +12,7 @@ most subtle movements or activities in the footage.
 """
 
 import argparse
+import dataclasses
 import json
 import pathlib
 import sys
@@ -161,7 +162,8 @@ def process_video(
     video_path: str, 
     output_dir: str, 
     skip_frames: int = 1, 
-    merged_output: Optional[str] = None
+    merged_output: Optional[str] = None,
+    motion_only: bool = False
 ) -> int:
     """
     Process a video with ultra-sensitive settings and optionally merge highlights.
@@ -171,6 +173,7 @@ def process_video(
         output_dir: Directory to save highlights and summary
         skip_frames: Process every Nth frame (1 = process all frames)
         merged_output: If provided, merge highlights into this output file
+        motion_only: Track motion blobs instead of running the object detector
     
     Returns:
         0 on success, 1 on failure
@@ -190,6 +193,9 @@ def process_video(
     
     # Get ultra-sensitive configurations
     motion_cfg, objdet_cfg, tracker_cfg, event_cfg, export_cfg = create_ultra_sensitive_configs()
+    if motion_only:
+        print("Motion-only mode: tracking motion blobs, no object detector")
+        objdet_cfg = dataclasses.replace(objdet_cfg, motion_only=True)
     
     # Patch the event analyzer to use a lower threshold
     original_filter = patch_event_analyzer()
@@ -275,6 +281,10 @@ def main():
         "--skip-frames", type=int, default=1,
         help="Process every Nth frame (default: 1, meaning process all frames)"
     )
+    parser.add_argument(
+        "--motion-only", action="store_true",
+        help="Fast triage: track motion blobs instead of running the object detector"
+    )
     parser.add_argument(
         "--merge", action="store_true",
         help="Merge all highlight clips into a single video"
@@ -294,7 +304,9 @@ def main():
     else:
         merged_output = None
     
-    return process_video(args.video, args.output, args.skip_frames, merged_output)
+    return process_video(
+        args.video, args.output, args.skip_frames, merged_output, args.motion_only
+    )
 
 
 if __name__ == "__main__":
@@ -41,6 +41,10 @@ setup(
             "torch>=1.9.0",
             "torchvision>=0.10.0",
         ],
+        "onnx": [
+            "onnx>=1.12.0",
+            "onnxruntime>=1.14.0",
+        ],
     },
     entry_points={
         "console_scripts": [
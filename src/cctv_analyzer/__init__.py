@@ -8,19 +8,25 @@ without digging through sub-modules.
 """
 
 from .config import (
+    VideoConfig,
+    CameraConfig,
     MotionDetectorConfig,
     ObjectDetectorConfig,
     ObjectTrackerConfig,
     EventAnalyzerConfig,
     VideoExporterConfig,
+    load_config,
 )
 from .pipeline import process_cctv_video as process_video
 
 __all__ = [
+    "VideoConfig",
+    "CameraConfig",
     "MotionDetectorConfig",
     "ObjectDetectorConfig",
     "ObjectTrackerConfig",
     "EventAnalyzerConfig",
     "VideoExporterConfig",
+    "load_config",
     "process_video",
 ]
@@ -0,0 +1,172 @@
+# src/cctv_analyzer/autotune.py
+"""Pick sampling stride, detector input size and batch size for a throughput target."""
+
+import dataclasses
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .core.object_detector import ObjectDetector
+from .core.video_utils import FrameSource
+from .pipeline import analyse_range
+
+logger = logging.getLogger(__name__)
+
+IMGSZ_STEPS = (640, 512, 416, 320)       # detector input sizes tried, largest first
+STRIDE_STEPS = (1, 2, 3, 4, 6, 8)        # multiples of the configured sampling stride
+BATCH_SIZES = (1, 4, 8)
+
+
+class TuningStep(NamedTuple):
+    """One combination of the settings the autotuner controls."""
+
+    skip_frames: int
+    imgsz: int
+    batch_size: int
+
+
+def ladder(stride: int, imgsz: int, batch_size: int) -> List[TuningStep]:
+    """Settings from the configured ones down to the cheapest.
+
+    Steps alternate between a smaller input size and a longer stride, so
+    neither small objects nor short events bear all of the loss; once the
+    smallest size is reached only the stride grows.
+    """
+    sizes = [imgsz] + [s for s in IMGSZ_STEPS if s < imgsz]
+    strides = [stride * m for m in STRIDE_STEPS]
+    si = ti = 0
+    steps = [TuningStep(strides[0] - 1, sizes[0], batch_size)]
+    while si < len(sizes) - 1 or ti < len(strides) - 1:
+        if si < len(sizes) - 1 and (si <= ti or ti == len(strides) - 1):
+            si += 1
+        else:
+            ti += 1
+        steps.append(TuningStep(strides[ti] - 1, sizes[si], batch_size))
+    return steps
+
+
+class ThroughputGovernor:
+    """Steps down the ladder while the analysis runs slower than the target.
+
+    :func:`analyse_range` calls :meth:`observe` with the timestamp of every
+    analysed frame.  After each ``window`` seconds of video it compares the
+    video time covered with the wall time spent; if that window ran below
+    ``target`` times real time, the next cheaper step is returned for the
+    caller to apply.  Settings never step back up within a run.
+    """
+
+    def __init__(self, steps: List[TuningStep], level: int, target: float, window: float):
+        self.steps = steps
+        self.level = level
+        self.target = target
+        self.window = window
+        self.adjustments: List[Dict[str, Any]] = []
+        self._start: Optional[tuple] = None
+
+    @property
+    def step(self) -> TuningStep:
+        return self.steps[self.level]
+
+    def observe(self, ts: float) -> Optional[TuningStep]:
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = (ts, now)
+            return None
+        ts0, t0 = self._start
+        if ts - ts0 < self.window:
+            return None
+        factor = (ts - ts0) / max(now - t0, 1e-9)
+        self._start = (ts, now)
+        if factor >= self.target or self.level == len(self.steps) - 1:
+            return None
+        self.level += 1
+        self.adjustments.append(
+            {"at_seconds": round(ts, 2), "realtime_factor": round(factor, 2), **self.step._asdict()}
+        )
+        logger.info(
+            "Throughput %.1fx below target %.1fx at %.0f s; now %s",
+            factor, self.target, ts, self.step,
+        )
+        return self.step
+
+
+def calibrate(
+    video_path: str,
+    target: float,
+    *,
+    video_cfg,
+    objdet_cfg,
+    skip_frames: int,
+    **analysis_cfg,
+) -> Dict[str, Any]:
+    """Choose the settings by timing short runs on the start of the video.
+
+    Each trial analyses the first ``video_cfg.autotune_seconds`` with one
+    already loaded detector.  The batch size is chosen first, as the
+    fastest of a few on the configured stride and size; the ladder (see
+    :func:`ladder`) is then walked until a step reaches ``target`` times
+    real time, or ends at its cheapest step.  Returns a report holding
+    the trials, the ``chosen`` step, a :class:`ThroughputGovernor`
+    positioned on it and the loaded ``detector`` (``None`` in motion-only
+    mode) for the main run to reuse.
+    """
+    source = FrameSource(video_path, skip_frames=skip_frames, sample_fps=video_cfg.sample_fps)
+    end_frame = min(max(int(video_cfg.autotune_seconds * source.fps), 1), source.frame_count)
+    video_seconds = end_frame / source.fps
+    video_cfg = dataclasses.replace(video_cfg, sample_fps=None)
+    detector = None
+    if not objdet_cfg.motion_only:
+        detector = ObjectDetector(objdet_cfg)
+        detector.detect([np.zeros((64, 64, 3), np.uint8)])  # model warm-up
+    trials: List[Dict[str, Any]] = []
+
+    def trial(step: TuningStep) -> float:
+        t0 = time.perf_counter()
+        analyse_range(
+            video_path,
+            video_cfg=video_cfg,
+            objdet_cfg=dataclasses.replace(
+                objdet_cfg, imgsz=step.imgsz, batch_size=step.batch_size
+            ),
+            skip_frames=step.skip_frames,
+            end_frame=end_frame,
+            detector=detector,
+            **analysis_cfg,
+        )
+        factor = video_seconds / (time.perf_counter() - t0)
+        trials.append({**step._asdict(), "realtime_factor": round(factor, 2)})
+        logger.info("Autotune trial %s: %.1fx real time", step, factor)
+        return factor
+
+    steps = ladder(source.stride, objdet_cfg.imgsz, objdet_cfg.batch_size)
+    batch_sizes = sorted({objdet_cfg.batch_size, *BATCH_SIZES})
+    if objdet_cfg.motion_only:
+        # without a detector only the stride matters
+        steps = [
+            step
+            for i, step in enumerate(steps)
+            if not i or step.skip_frames != steps[i - 1].skip_frames
+        ]
+        batch_sizes = [objdet_cfg.batch_size]
+    speed = {b: trial(steps[0]._replace(batch_size=b)) for b in batch_sizes}
+    batch_size = max(speed, key=speed.get)
+    steps = [step._replace(batch_size=batch_size) for step in steps]
+
+    level, factor = 0, speed[batch_size]
+    while factor < target and level < len(steps) - 1:
+        level += 1
+        factor = trial(steps[level])
+    if factor < target:
+        logger.warning(
+            "Cheapest settings reach %.1fx real time, below the %.1fx target", factor, target
+        )
+    return {
+        "target": target,
+        "calibration_seconds": round(video_seconds, 2),
+        "trials": trials,
+        "chosen": steps[level]._asdict(),
+        "governor": ThroughputGovernor(steps, level, target, video_cfg.autotune_window_seconds),
+        "detector": detector,
+    }
@@ -1,7 +1,43 @@
 """Strongly-typed configuration objects for every core component."""
 
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+
+# ─────────────────── Video - input ────────────────────────
+@dataclass
+class VideoConfig:
+    # analysis proxy (w, h); frames are shrunk to fit, None keeps source size
+    target_resolution: Optional[List[int]] = field(
+        default_factory=lambda: [640, 480]
+    )
+    skip_frames: int = 2
+    sample_fps: Optional[float] = None    # sample by time; overrides skip_frames
+    seek_sampling: bool = False           # seek to samples instead of grabbing
+    grayscale_motion: bool = False        # run background subtraction on gray
+    decoder: str = "opencv"               # or "ffmpeg" (rawvideo pipe)
+    decoder_threads: int = 0              # 0 = backend default
+    keyframe_index: bool = False          # probe once, keep a sidecar index
+    prefetch_depth: int = 8               # frames decoded ahead; 0 = no thread
+    frame_cache_dir: Optional[str] = None # mmap frame cache shared with export
+    frame_cache_max_gb: float = 20.0
+    workers: int = 1                      # >1 analyses keyframe-aligned chunks in parallel
+    chunk_overlap_seconds: float = 10.0   # warm-up decoded before each chunk
+    primed_overlap_seconds: float = 2.0   # ...when a saved background primes motion
+    realtime_target: Optional[float] = None  # autotune to run >= N x real time
+    autotune_seconds: float = 5.0         # footage timed per calibration trial
+    autotune_window_seconds: float = 60.0 # video time per throughput check
+
+
+# ─────────────────── Camera - regions ─────────────────────
+@dataclass
+class CameraConfig:
+    name: str = "default"
+    # polygons as [[x, y], ...] in source-frame pixels
+    roi: List[List[List[float]]] = field(default_factory=list)      # empty = whole frame
+    exclude: List[List[List[float]]] = field(default_factory=list)  # never analysed
 
 
 # ─────────────────── Motion - detector ────────────────────
@@ -13,18 +49,43 @@ class MotionDetectorConfig:
     history: int = 500
     morphology_kernel_size: int = 5
     min_area: int = 300                   # px²
+    adaptive_window: int = 30             # frames each side of the threshold window
+    causal_threshold: bool = False        # only look back (streaming decisions)
+    background_dir: Optional[str] = None  # per-camera saved backgrounds (warm start)
+    prime_steps: int = 8                  # noisy background frames used to prime
 
 
 # ─────────────────── Object - detector ────────────────────
 @dataclass
 class ObjectDetectorConfig:
     model: str = "yolov8n.pt"
+    motion_only: bool = False             # track motion blobs instead; no model is loaded
     relevant_classes: List[str] = field(
         default_factory=lambda: ["person", "car", "truck", "bicycle"]
     )
     confidence_threshold: float = 0.5
     nms_threshold: float = 0.4
-    device: str = "cuda"                  # "cpu" or "cuda"
+    backend: str = "ultralytics"          # or "onnxruntime", "opencv" (cv2.dnn)
+    device: str = "auto"                  # "auto", "cpu" or "cuda"
+    imgsz: int = 640                      # inference size (long side)
+    batch_size: int = 1                   # frames per model call
+    quantize: str = "none"                # INT8 model: "none", "dynamic" or "static" (ONNX backends)
+    calibration_video: Optional[str] = None  # footage for static INT8 calibration
+    calibration_frames: int = 64          # frames sampled from it
+    motion_gating: bool = False           # skip frames without motion
+    gating_min_motion: float = 0.0        # motion score that counts as motion
+    gating_holdover: int = 5              # keep detecting N frames after motion
+    keepalive_interval: int = 0           # force a detection every N frames
+    dedup_frames: bool = False            # reuse detections on near-identical frames
+    dedup_threshold: float = 6.0          # max thumbnail pixel change of a duplicate (0-255)
+    crop_detection: bool = False          # detect on crops around motion blobs
+    crop_imgsz: int = 320                 # inference size of the crops
+    crop_padding: float = 1.0             # padding per side, x the blob's longer side
+    crop_min_size: int = 64               # min crop side, analysis-frame px
+    crop_max_crops: int = 4               # crops per frame at most
+    crop_max_coverage: float = 0.4        # full frame if crops cover more than this
+    detect_interval: int = 1              # detect every K frames, optical flow in between
+    propagation_min_confidence: float = 0.5  # re-detect below this share of tracked points
 
 
 # ─────────────────── Object - tracker ─────────────────────
@@ -33,6 +94,10 @@ class ObjectTrackerConfig:
     iou_threshold: float = 0.3
     max_disappeared: int = 10
     min_track_length: int = 8
+    matching: str = "hungarian"           # or "greedy" (best IoU pair first)
+    max_history: int = 10000              # entries kept per track, oldest dropped; 0 = all
+    grid_gating: bool = True              # compare only boxes sharing a grid cell (crowded scenes)
+    grid_cell_size: float = 0.0           # px; 0 = twice the median box side
 
 
 # ─────────────────── Event - analyzer ─────────────────────
@@ -52,3 +117,40 @@ class VideoExporterConfig:
     output_format: str = "mp4"
     video_codec: str = "mp4v"
     add_annotations: bool = True
+    stream_copy: bool = False             # cut at keyframes, no re-encode
+
+
+# YAML section → (process_cctv_video keyword, config class)
+_YAML_SECTIONS = {
+    "video": ("video_cfg", VideoConfig),
+    "motion_detection": ("motion_cfg", MotionDetectorConfig),
+    "object_detection": ("objdet_cfg", ObjectDetectorConfig),
+    "tracking": ("tracker_cfg", ObjectTrackerConfig),
+    "event_detection": ("event_cfg", EventAnalyzerConfig),
+}
+
+
+def load_config(path: str, camera: Optional[str] = None) -> Dict[str, Any]:
+    """Read a YAML file such as ``config/default_config.yaml``.
+
+    Returns keyword arguments for ``process_cctv_video``.  Keys that a
+    config class does not know about are ignored.  ``camera`` selects an
+    entry of the ``cameras:`` section for ``camera_cfg``.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        raw = yaml.safe_load(fh) or {}
+
+    kwargs: Dict[str, Any] = {}
+    for section, (kwarg, cls) in _YAML_SECTIONS.items():
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in (raw.get(section) or {}).items() if k in known}
+        kwargs[kwarg] = cls(**values)
+
+    if camera is not None:
+        cameras = raw.get("cameras") or {}
+        if camera not in cameras:
+            raise ValueError(f"Camera {camera!r} not found in {path}")
+        known = {f.name for f in fields(CameraConfig)}
+        values = {k: v for k, v in (cameras[camera] or {}).items() if k in known}
+        kwargs["camera_cfg"] = CameraConfig(**{**values, "name": camera})
+    return kwargs
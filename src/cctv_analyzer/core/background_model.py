@@ -0,0 +1,58 @@
+# core/background_model.py
+"""Per-camera background reference used to warm-start motion detection."""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackgroundModel:
+    """Background image and per-pixel noise learned at the end of a run.
+
+    ``image`` has the shape of the frames fed to ``MotionDetector``
+    (analysis proxy, cropped to the camera region, gray or BGR), so a model
+    only primes runs with the same analysis geometry.
+    """
+
+    image: np.ndarray
+    noise_sigma: np.ndarray   # per-pixel noise std, grey levels, same shape
+    frames_seen: int
+    algorithm: str
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".part"
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                image=self.image,
+                noise_sigma=self.noise_sigma,
+                frames_seen=self.frames_seen,
+                algorithm=self.algorithm,
+            )
+        os.replace(tmp, path)
+        logger.info("Saved background model to %s", path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BackgroundModel"]:
+        """Read a saved model, or ``None`` if there is none."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                image=data["image"],
+                noise_sigma=data["noise_sigma"],
+                frames_seen=int(data["frames_seen"]),
+                algorithm=str(data["algorithm"]),
+            )
+
+
+def background_path(background_dir: str, camera: str) -> str:
+    """Location of the saved background for ``camera``."""
+    return os.path.join(background_dir, f"{camera}.bg.npz")
@@ -0,0 +1,116 @@
+# core/box_propagator.py
+"""Carry detections across frames the detector skips, with sparse optical flow."""
+
+import logging
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from ..models.detection_models import DetectionBatch
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_BOX = 20
+MIN_POINTS = 4                           # re-sample a box below this many points
+MAX_FB_ERROR = 1.0                       # px, forward-backward flow disagreement
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+)
+
+
+class BoxPropagator:
+    """Moves the boxes of the last detection along Lucas-Kanade flow.
+
+    :meth:`reset` takes a detected frame (grey, detection-frame pixels)
+    and its detections; :meth:`propagate` then shifts and scales every box
+    by the median motion of the corner points inside it.  A point counts
+    only if forward and backward flow agree; a box's confidence is the
+    share of its points that do.  When any box falls below
+    ``propagation_min_confidence`` the frame should be detected again,
+    signalled by ``None``.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._gray: Optional[np.ndarray] = None
+        self._batch: Optional[DetectionBatch] = None
+        self._points: List[np.ndarray] = []
+
+    def reset(self, gray: np.ndarray, batch: DetectionBatch) -> None:
+        self._gray = gray
+        self._batch = batch
+        self._points = [self._sample(gray, box) for box in batch.xyxy]
+
+    def propagate(self, gray: np.ndarray) -> Optional[DetectionBatch]:
+        """Detections moved to ``gray``, or ``None`` if tracking is unsure."""
+        if self._batch is None or gray.shape != self._gray.shape:
+            return None
+        if not len(self._batch):
+            self._gray = gray
+            return self._batch
+
+        counts = [len(p) for p in self._points]
+        if min(counts) == 0:
+            return None
+        points = np.concatenate(self._points).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, points, None, **LK_PARAMS)
+        back, status_back, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, moved, None, **LK_PARAMS)
+        good = (
+            (status.ravel() == 1)
+            & (status_back.ravel() == 1)
+            & (np.linalg.norm(back - points, axis=2).ravel() < MAX_FB_ERROR)
+        )
+
+        h, w = gray.shape[:2]
+        xyxy = self._batch.xyxy.copy()
+        kept: List[np.ndarray] = []
+        start = 0
+        for i, n in enumerate(counts):
+            ok = good[start : start + n]
+            old = points[start : start + n, 0][ok]
+            new = moved[start : start + n, 0][ok]
+            start += n
+            if ok.mean() < self.config.propagation_min_confidence:
+                return None
+            shift = np.median(new - old, axis=0)
+            scale = 1.0
+            if len(old) >= 3:
+                spread_old = np.linalg.norm(old - old.mean(axis=0), axis=1)
+                spread_new = np.linalg.norm(new - new.mean(axis=0), axis=1)
+                valid = spread_old > 1.0
+                if valid.any():
+                    scale = float(np.median(spread_new[valid] / spread_old[valid]))
+            center = (xyxy[i, :2] + xyxy[i, 2:]) / 2 + shift
+            half = (xyxy[i, 2:] - xyxy[i, :2]) / 2 * scale
+            xyxy[i] = np.concatenate([center - half, center + half])
+            kept.append(new.astype(np.float32))
+
+        xyxy = np.clip(xyxy, 0, [w, h, w, h])
+        self._batch = DetectionBatch(
+            xyxy, self._batch.conf, self._batch.class_id, self._batch.frame_idx, self._batch.names
+        )
+        self._points = [
+            p if len(p) >= MIN_POINTS else self._sample(gray, box)
+            for p, box in zip(kept, xyxy)
+        ]
+        self._gray = gray
+        return self._batch
+
+    @staticmethod
+    def _sample(gray: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """Corner points inside ``box`` (frame coordinates, (N, 2) float32)."""
+        # a small margin keeps corners lying on the box edge
+        x1, y1, x2, y2 = np.round(box).astype(int) + [-2, -2, 2, 2]
+        x1, y1 = max(x1, 0), max(y1, 0)
+        roi = gray[y1:y2, x1:x2]
+        if roi.shape[0] < 3 or roi.shape[1] < 3:
+            return np.zeros((0, 2), np.float32)
+        corners = cv2.goodFeaturesToTrack(
+            roi, POINTS_PER_BOX, qualityLevel=0.01, minDistance=3
+        )
+        if corners is None:
+            return np.zeros((0, 2), np.float32)
+        return corners.reshape(-1, 2) + np.array([x1, y1], np.float32)
@@ -0,0 +1,226 @@
+# core/decoders.py
+"""Video decoder backends behind one small capture-like interface."""
+
+import logging
+import subprocess
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .keyframe_index import KeyframeIndex
+
+logger = logging.getLogger(__name__)
+
+
+class VideoDecoder:
+    """Sequential decoder with ``cv2.VideoCapture``-style grab/retrieve.
+
+    ``size`` (w, h) and ``gray`` select the output format; backends that
+    can do so convert inside the decoder.  ``width``/``height`` describe the
+    output frames, ``source_size`` the encoded video.
+
+    Given a :class:`KeyframeIndex`, :meth:`seek` jumps to the preceding
+    keyframe and decodes forward, which is frame-accurate and costs at most
+    one GOP of decoding.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        *,
+        size: Optional[Sequence[int]] = None,
+        gray: bool = False,
+        index: Optional[KeyframeIndex] = None,
+    ):
+        self.video_path = video_path
+        self.gray = gray
+        self.index = index
+        self.position = 0                 # index of the next frame grab() returns
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video: {video_path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.source_size: Tuple[int, int] = (
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+        cap.release()
+
+        self.width, self.height = tuple(size) if size else self.source_size
+
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        if self.gray:
+            return (self.height, self.width)
+        return (self.height, self.width, 3)
+
+    def grab(self) -> bool:
+        if not self._grab():
+            return False
+        self.position += 1
+        return True
+
+    def _grab(self) -> bool:
+        raise NotImplementedError
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        raise NotImplementedError
+
+    def seek(self, frame_idx: int) -> None:
+        """Position the decoder so the next grab returns ``frame_idx``."""
+        if self.index is None:
+            self._seek(frame_idx)
+            self.position = frame_idx
+            return
+
+        key = self.index.keyframe_before(frame_idx)
+        if not (key <= self.position <= frame_idx):
+            self._seek(key)
+            self.position = key
+        while self.position < frame_idx and self.grab():
+            pass
+
+    def _seek(self, frame_idx: int) -> None:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def __enter__(self) -> "VideoDecoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class OpenCVDecoder(VideoDecoder):
+    """``cv2.VideoCapture``; scaling and gray conversion run after decode."""
+
+    def __init__(self, video_path: str, *, threads: int = 0, **kwargs):
+        super().__init__(video_path, **kwargs)
+        params = []
+        if threads and hasattr(cv2, "CAP_PROP_N_THREADS"):
+            params = [cv2.CAP_PROP_N_THREADS, threads]
+        self.cap = cv2.VideoCapture(video_path, cv2.CAP_ANY, params)
+        if not self.cap.isOpened():
+            raise ValueError(f"Cannot open video: {video_path}")
+
+    def _grab(self) -> bool:
+        return self.cap.grab()
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return False, None
+        if (self.width, self.height) != self.source_size:
+            frame = cv2.resize(
+                frame, (self.width, self.height), interpolation=cv2.INTER_AREA
+            )
+        if self.gray:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return True, frame
+
+    def _seek(self, frame_idx: int) -> None:
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class FFmpegDecoder(VideoDecoder):
+    """Bundled ffmpeg writing rawvideo to a pipe.
+
+    Decoding is multi-threaded inside ffmpeg and scaling / pixel-format
+    conversion run there too, so Python only copies finished frames out of
+    the pipe.  ``threads=0`` lets ffmpeg pick the thread count.
+    """
+
+    def __init__(self, video_path: str, *, threads: int = 0, **kwargs):
+        super().__init__(video_path, **kwargs)
+        import imageio_ffmpeg
+
+        self._exe = imageio_ffmpeg.get_ffmpeg_exe()
+        self.threads = threads
+        self._frame_bytes = int(np.prod(self.frame_shape))
+        self._pending: Optional[np.ndarray] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._start(0)
+
+    def _command(self, start_frame: int) -> List[str]:
+        cmd = [self._exe, "-v", "error", "-nostdin", "-threads", str(self.threads)]
+        if start_frame and self.index is not None:
+            cmd += ["-ss", f"{self.index.frame_time(start_frame):.6f}"]
+        elif start_frame and self.fps:
+            cmd += ["-ss", f"{start_frame / self.fps:.6f}"]
+        cmd += ["-i", self.video_path, "-map", "0:v:0"]
+        if (self.width, self.height) != self.source_size:
+            cmd += ["-vf", f"scale={self.width}:{self.height}:flags=area"]
+        cmd += [
+            "-f", "rawvideo",
+            "-pix_fmt", "gray" if self.gray else "bgr24",
+            "-vsync", "passthrough",
+            "-",
+        ]
+        return cmd
+
+    def _start(self, start_frame: int) -> None:
+        self.release()
+        self._proc = subprocess.Popen(
+            self._command(start_frame),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=self._frame_bytes * 2,
+        )
+
+    def _grab(self) -> bool:
+        if self._proc is None:
+            return False
+        frame = np.empty(self.frame_shape, dtype=np.uint8)
+        view = memoryview(frame).cast("B")
+        filled = 0
+        while filled < self._frame_bytes:
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                self._pending = None
+                return False
+            filled += n
+        self._pending = frame
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame, self._pending = self._pending, None
+        return frame is not None, frame
+
+    def _seek(self, frame_idx: int) -> None:
+        # -ss before -i seeks to the preceding keyframe and decodes forward
+        self._start(frame_idx)
+
+    def release(self) -> None:
+        if self._proc is not None:
+            self._proc.stdout.close()
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+
+DECODERS = {
+    "opencv": OpenCVDecoder,
+    "ffmpeg": FFmpegDecoder,
+}
+
+
+def open_decoder(video_path: str, backend: str = "opencv", **kwargs) -> VideoDecoder:
+    """Create a decoder by backend name (``"opencv"`` or ``"ffmpeg"``)."""
+    try:
+        cls = DECODERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown decoder backend: {backend}") from None
+    return cls(video_path, **kwargs)
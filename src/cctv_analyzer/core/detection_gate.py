@@ -0,0 +1,150 @@
+# core/detection_gate.py
+"""Per-frame policy deciding whether the object detector has to run."""
+
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+SIGNATURE_WIDTH = 64                      # px, thumbnail compared for dedup
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """Small thumbnail of ``frame``, area-averaged so sensor noise cancels.
+
+    Colour is kept: objects of similar luminance to the background are
+    only visible in the chroma.
+    """
+    h, w = frame.shape[:2]
+    size = (SIGNATURE_WIDTH, max(1, round(h * SIGNATURE_WIDTH / w)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+class DetectionGate:
+    """Motion-gated detection cascade.
+
+    With ``motion_gating`` enabled the detector only runs on frames whose
+    motion score exceeds ``gating_min_motion``, plus ``gating_holdover``
+    frames after the last motion and one keep-alive detection every
+    ``keepalive_interval`` frames.  Frames the gate rejects must be passed
+    to the tracker as *not observed* (``None``), not as empty.
+
+    With ``dedup_frames`` enabled, :meth:`is_duplicate` further lets a frame
+    that passed the gate reuse the previous detections when it is nearly
+    identical to the last frame the detector ran on.  With
+    ``detect_interval`` K above 1, :meth:`is_propagated` sends only every
+    K-th consecutive frame to the detector; the others get the previous
+    detections moved by optical flow.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.frames = 0
+        self.detector_calls = 0
+        self._since_motion: Optional[int] = None
+        self._since_detection: Optional[int] = None
+        self.reused_frames = 0
+        self._signature: Optional[np.ndarray] = None
+        self.propagated_frames = 0
+        self.redetections = 0
+        self._since_keyframe: Optional[int] = None
+
+    def should_detect(self, motion_score: float) -> bool:
+        self.frames += 1
+        cfg = self.config
+
+        if motion_score > cfg.gating_min_motion:
+            self._since_motion = 0
+        elif self._since_motion is not None:
+            self._since_motion += 1
+
+        run = (
+            not cfg.motion_gating
+            or (
+                self._since_motion is not None
+                and self._since_motion <= cfg.gating_holdover
+            )
+            or (
+                cfg.keepalive_interval > 0
+                and (
+                    self._since_detection is None
+                    or self._since_detection + 1 >= cfg.keepalive_interval
+                )
+            )
+        )
+
+        if run:
+            self.detector_calls += 1
+            self._since_detection = 0
+        else:
+            if self._since_detection is not None:
+                self._since_detection += 1
+            # flow does not bridge frames the gate skipped
+            self._since_keyframe = None
+        return run
+
+    def is_duplicate(self, frame: np.ndarray) -> bool:
+        """Whether a frame that passed :meth:`should_detect` can reuse the
+        last detections instead of calling the detector.
+
+        It can if no pixel (or channel) of its signature differs by more
+        than ``dedup_threshold`` levels from that of the last detected
+        frame.  Comparing with the last *detected* frame, not the previous
+        one, keeps slow changes from creeping through.
+        """
+        if not self.config.dedup_frames:
+            return False
+        signature = frame_signature(frame)
+        if (
+            self._signature is not None
+            and signature.shape == self._signature.shape
+            and cv2.absdiff(signature, self._signature).max() <= self.config.dedup_threshold
+        ):
+            # passed the gate but needs no detector call
+            self.detector_calls -= 1
+            self.reused_frames += 1
+            return True
+        self._signature = signature
+        return False
+
+    def is_propagated(self) -> bool:
+        """Whether a frame that passed :meth:`should_detect` gets the last
+        detections propagated instead of a detector call.
+        """
+        interval = self.config.detect_interval
+        if interval > 1 and self._since_keyframe is not None and self._since_keyframe + 1 < interval:
+            self._since_keyframe += 1
+            self.detector_calls -= 1
+            self.propagated_frames += 1
+            return True
+        self._since_keyframe = 0
+        return False
+
+    def record_redetection(self, propagated_since: Optional[int] = 0) -> None:
+        """A propagated frame was detected after all (flow lost track).
+
+        It becomes a keyframe, so the count to the next one restarts there.
+        Frames are queued before detection runs: ``propagated_since`` is the
+        number of frames after it already queued as propagated, or ``None``
+        if a later keyframe or skipped frame has restarted the count already.
+        """
+        self.detector_calls += 1
+        self.propagated_frames -= 1
+        self.redetections += 1
+        if propagated_since is not None:
+            self._since_keyframe = propagated_since
+
+    @property
+    def stats(self) -> Dict:
+        skipped = self.frames - self.detector_calls
+        return {
+            "frames": self.frames,
+            "detector_calls": self.detector_calls,
+            "dedup_calls_saved": self.reused_frames,
+            "propagated_frames": self.propagated_frames,
+            "redetections": self.redetections,
+            "skipped_fraction": round(skipped / self.frames, 4) if self.frames else 0.0,
+            "detector_speedup": round(self.frames / self.detector_calls, 2)
+            if self.detector_calls
+            else None,
+        }
@@ -1,9 +1,10 @@
 # core/event_analyzer.py
 """Event analysis module for detecting unusual activities."""
 
+import bisect
 import logging
 import math
-from typing import Dict, List
+from typing import Dict, List, Sequence
 
 import numpy as np
 
@@ -24,32 +25,39 @@ class EventAnalyzer:
         tracking_data: Dict,
         timestamps: List[float],
         fps: float,
+        track_events: Sequence[Event] = (),
     ) -> List[Event]:
+        """Score and rank motion and track events.
+
+        ``track_events`` were already found by :meth:`track_events` on
+        tracks analysed as they finished; ``tracking_data`` holds the
+        histories still to analyse.
+        """
         events: List[Event] = []
 
-        events.extend(self._analyze_motion_events(motion_data, timestamps))
-        events.extend(self._analyze_behavior_events(tracking_data, fps))
+        events.extend(self._analyze_motion_events(motion_data, timestamps, fps))
+        events.extend(track_events)
+        events.extend(self._analyze_behavior_events(tracking_data))
 
-        events = self._score_events(events, motion_data)
+        events = self._score_events(events, motion_data, timestamps)
         return self._filter_events(events)
 
     def _analyze_motion_events(
-        self, motion_data: Dict, timestamps: List[float]
+        self, motion_data: Dict, timestamps: List[float], fps: float
     ) -> List[Event]:
         events: List[Event] = []
-        for idx, (is_motion, score, ts) in enumerate(
-            zip(
-                motion_data["motion_events"],
-                motion_data["motion_scores"],
-                timestamps,
-            )
+        for is_motion, score, ts in zip(
+            motion_data["motion_events"],
+            motion_data["motion_scores"],
+            timestamps,
         ):
             if is_motion and score > self.config.motion_sensitivity:
                 events.append(
                     Event(
                         type="motion_detected",
                         timestamp=ts,
-                        frame_idx=idx,
+                        # source frame number, as on track events
+                        frame_idx=int(round(ts * fps)),
                         score=score,
                         confidence=min(score * 10, 1.0),
                         metadata={"motion_score": score},
@@ -57,32 +65,40 @@ class EventAnalyzer:
                 )
         return events
 
-    def _analyze_behavior_events(
-        self, tracking_data: Dict, fps: float
-    ) -> List[Event]:
+    def _analyze_behavior_events(self, tracking_data: Dict) -> List[Event]:
         events: List[Event] = []
         for obj_id, hist in tracking_data.items():
-            if len(hist) < 10:
-                continue
-            speeds = self._calculate_speeds(hist, fps)
-            positions = [t["centroid"] for t in hist]
-            events.extend(self._detect_sudden_movements(obj_id, hist, speeds, fps))
-            events.extend(self._detect_loitering(obj_id, hist, positions, fps))
-            events.extend(self._detect_direction_changes(obj_id, hist, positions))
+            events.extend(self.track_events(obj_id, hist))
         return events
 
+    def track_events(self, obj_id: int, hist: List[Dict]) -> List[Event]:
+        """Unscored sudden-movement, loitering and direction-change events of one track."""
+        if len(hist) < 10:
+            return []
+        speeds = self._calculate_speeds(hist)
+        positions = [t["centroid"] for t in hist]
+        return [
+            *self._detect_sudden_movements(obj_id, hist, speeds),
+            *self._detect_loitering(obj_id, hist, positions),
+            *self._detect_direction_changes(obj_id, hist, positions),
+        ]
+
     @staticmethod
-    def _calculate_speeds(history: List[Dict], fps: float) -> List[float]:
+    def _calculate_speeds(history: List[Dict]) -> List[float]:
+        """Pixels per second between consecutive entries.
+
+        Entries need not be consecutive frames (stride, gating, detector
+        holdover), so each distance is divided by its own time gap.
+        """
         speeds = []
-        for i in range(1, len(history)):
-            prev = history[i - 1]["centroid"]
-            curr = history[i]["centroid"]
-            dist = math.hypot(curr[0] - prev[0], curr[1] - prev[1])
-            speeds.append(dist * fps)  # pixels per second
+        for prev, curr in zip(history, history[1:]):
+            (x0, y0), (x1, y1) = prev["centroid"], curr["centroid"]
+            dt = curr["timestamp"] - prev["timestamp"]
+            speeds.append(math.hypot(x1 - x0, y1 - y0) / dt if dt > 0 else 0.0)
         return speeds
 
     def _detect_sudden_movements(
-        self, obj_id: int, hist: List[Dict], speeds: List[float], fps: float
+        self, obj_id: int, hist: List[Dict], speeds: List[float]
     ) -> List[Event]:
         events = []
         if not speeds:
@@ -111,14 +127,14 @@ class EventAnalyzer:
         return events
 
     def _detect_loitering(
-        self, obj_id: int, hist: List[Dict], positions: List[tuple], fps: float
+        self, obj_id: int, hist: List[Dict], positions: List[tuple]
     ) -> List[Event]:
         events = []
         if len(hist) < self.config.loitering_frames:
             return events
         var = np.var(np.array(positions), axis=0).sum()
         if var < self.config.loitering_variance_threshold:
-            duration = len(hist) / fps
+            duration = hist[-1]["timestamp"] - hist[0]["timestamp"]
             last = hist[-1]
             events.append(
                 Event(
@@ -183,7 +199,9 @@ class EventAnalyzer:
                 )
         return events
 
-    def _score_events(self, events: List[Event], motion_data: Dict) -> List[Event]:
+    def _score_events(
+        self, events: List[Event], motion_data: Dict, timestamps: List[float]
+    ) -> List[Event]:
         motion_scores = motion_data["motion_scores"]
         type_weights = {
             "sudden_movement": 0.8,
@@ -193,9 +211,9 @@ class EventAnalyzer:
         }
 
         for e in events:
-            motion_bonus = (
-                motion_scores[e.frame_idx] * 0.2 if e.frame_idx < len(motion_scores) else 0
-            )
+            # track entries carry source frame numbers; find the sample by time
+            idx = bisect.bisect_left(timestamps, e.timestamp)
+            motion_bonus = motion_scores[idx] * 0.2 if idx < len(motion_scores) else 0
             e.score = min(e.score + motion_bonus, 1.0) * type_weights.get(e.type, 0.5)
         return events
 
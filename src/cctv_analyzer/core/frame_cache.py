@@ -0,0 +1,177 @@
+# core/frame_cache.py
+"""On-disk cache of decoded frames, read back zero-copy through mmap."""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CachedVideo:
+    """Read-only, memory-mapped view of every frame of one video."""
+
+    def __init__(self, frames: np.ndarray, meta: Dict):
+        self.frames = frames
+        self.fps: float = meta["fps"]
+        self.width: int = meta["width"]
+        self.height: int = meta["height"]
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.frames[idx]
+
+
+class FrameCacheWriter:
+    """Fills a cache entry while the video is being decoded.
+
+    Nothing becomes visible to readers until :meth:`commit`; an entry that
+    was not committed (decode aborted, frame count wrong) is discarded.
+    """
+
+    def __init__(self, cache: "FrameCache", key: str, meta: Dict):
+        self.cache = cache
+        self.key = key
+        self.meta = meta
+        self.count = 0
+        # unique per writer: concurrent runs on one video must not share it
+        self._tmp = cache.dir / f"{key}.{os.getpid()}.{uuid.uuid4().hex}.frames.part"
+        shape = (meta["capacity"], meta["height"], meta["width"], 3)
+        self._frames = np.memmap(self._tmp, dtype=np.uint8, mode="w+", shape=shape)
+        self._failed = False
+
+    def write(self, idx: int, frame: np.ndarray) -> None:
+        if self._failed:
+            return
+        if (
+            idx != self.count
+            or idx >= len(self._frames)
+            or frame.shape != self._frames.shape[1:]
+        ):
+            logger.warning("Frame cache entry %s abandoned at frame %d", self.key, idx)
+            self._failed = True
+            return
+        self._frames[idx] = frame
+        self.count += 1
+
+    def commit(self) -> None:
+        if self._failed or not self.count:
+            self.abort()
+            return
+        self._frames.flush()
+        del self._frames
+        os.replace(self._tmp, self.cache.dir / f"{self.key}.frames")
+        self.meta["frame_count"] = self.count
+        self.cache._meta_path(self.key).write_text(json.dumps(self.meta))
+        logger.info("Cached %d frames for %s", self.count, self.meta["video_path"])
+
+    def abort(self) -> None:
+        self._failed = True
+        if hasattr(self, "_frames"):
+            del self._frames
+        self._tmp.unlink(missing_ok=True)
+
+
+class FrameCache:
+    """Raw BGR frames on disk, keyed by video path, mtime and resolution.
+
+    Entries are written during the analysis decode and memory-mapped by
+    later readers (the highlight exporter, re-runs), so frames are never
+    decoded twice.  The total size is capped at ``max_bytes``; the least
+    recently used entries are evicted to make room.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(video_path: str, resolution: Tuple[int, int]) -> str:
+        st = os.stat(video_path)
+        ident = (
+            f"{os.path.abspath(video_path)}|{st.st_mtime_ns}|{st.st_size}"
+            f"|{resolution[0]}x{resolution[1]}"
+        )
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def open(
+        self, video_path: str, resolution: Tuple[int, int]
+    ) -> Optional[CachedVideo]:
+        """Memory-map a committed entry, or return ``None`` on a miss."""
+        key = self.key(video_path, resolution)
+        meta_path = self._meta_path(key)
+        frames_path = self.dir / f"{key}.frames"
+        if not meta_path.exists() or not frames_path.exists():
+            return None
+
+        meta = json.loads(meta_path.read_text())
+        frames = np.memmap(
+            frames_path,
+            dtype=np.uint8,
+            mode="r",
+            shape=(meta["capacity"], meta["height"], meta["width"], 3),
+        )[: meta["frame_count"]]
+        os.utime(meta_path)  # LRU bookkeeping
+        return CachedVideo(frames, meta)
+
+    def writer(
+        self,
+        video_path: str,
+        resolution: Tuple[int, int],
+        frame_count: int,
+        fps: float,
+    ) -> Optional[FrameCacheWriter]:
+        """Start a new entry, or return ``None`` if it can never fit."""
+        width, height = resolution
+        # CAP_PROP_FRAME_COUNT is an estimate; leave a second of headroom
+        capacity = frame_count + max(1, int(round(fps)))
+        needed = capacity * width * height * 3
+        if frame_count <= 0:
+            return None
+        if needed > self.max_bytes:
+            logger.info(
+                "Not caching %s: %.1f GB exceeds the %.1f GB cap",
+                video_path, needed / 1e9, self.max_bytes / 1e9,
+            )
+            return None
+
+        key = self.key(video_path, resolution)
+        self._evict(needed, keep=key)
+        meta = {
+            "video_path": os.path.abspath(video_path),
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "capacity": capacity,
+        }
+        return FrameCacheWriter(self, key, meta)
+
+    def _evict(self, needed: int, keep: str) -> None:
+        entries = []
+        for meta_path in self.dir.glob("*.json"):
+            frames_path = meta_path.with_suffix(".frames")
+            size = frames_path.stat().st_size if frames_path.exists() else 0
+            entries.append((meta_path.stat().st_mtime, meta_path, frames_path, size))
+
+        used = sum(e[3] for e in entries)
+        for _, meta_path, frames_path, size in sorted(entries):
+            if used + needed <= self.max_bytes:
+                break
+            if meta_path.stem == keep:
+                continue
+            logger.info("Evicting cached frames %s", meta_path.stem)
+            meta_path.unlink(missing_ok=True)
+            frames_path.unlink(missing_ok=True)
+            used -= size
@@ -0,0 +1,47 @@
+# core/geometry.py
+"""Box geometry shared by tracking, chunk stitching, NMS and detector evaluation."""
+
+import cv2
+import numpy as np
+
+
+def pair_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Element-wise IoU of boxes ``a`` (..., 4) and ``b`` (..., 4), broadcast."""
+    a = np.asarray(a, np.float64)
+    b = np.asarray(b, np.float64)
+    tl = np.maximum(a[..., :2], b[..., :2])
+    br = np.minimum(a[..., 2:], b[..., 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=-1)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, M) IoU of every box in ``a`` (N, 4) with every box in ``b`` (M, 4)."""
+    a = np.asarray(a, np.float64).reshape(-1, 4)
+    b = np.asarray(b, np.float64).reshape(-1, 4)
+    return pair_iou(a[:, None, :], b[None, :, :])
+
+
+def batched_nms(
+    xywh: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, score: float, iou: float
+) -> np.ndarray:
+    """Per-class NMS; indices of the kept boxes, highest score first.
+
+    ``cv2.dnn.NMSBoxesBatched`` needs OpenCV 4.7; older builds run
+    ``cv2.dnn.NMSBoxes`` once per class instead.
+    """
+    if hasattr(cv2.dnn, "NMSBoxesBatched"):
+        keep = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), scores.tolist(), class_ids.tolist(), score, iou
+        )
+        return np.asarray(keep, np.int64).reshape(-1)
+    kept = []
+    for cid in np.unique(class_ids):
+        rows = np.flatnonzero(class_ids == cid)
+        keep = cv2.dnn.NMSBoxes(xywh[rows].tolist(), scores[rows].tolist(), score, iou)
+        kept.append(rows[np.asarray(keep, np.int64).reshape(-1)])
+    kept = np.concatenate(kept) if kept else np.zeros(0, np.int64)
+    return kept[np.argsort(-scores[kept], kind="stable")]
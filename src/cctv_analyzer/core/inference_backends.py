@@ -0,0 +1,327 @@
+# core/inference_backends.py
+"""Object-detection inference backends behind one small interface."""
+
+import ast
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .geometry import batched_nms
+from .quantization import quantize_model, sample_frames
+
+logger = logging.getLogger(__name__)
+
+MAX_DETECTIONS = 300                     # per image, as in Ultralytics
+
+
+class InferenceBackend:
+    """Runs a YOLO detector on a batch of BGR frames.
+
+    ``predict`` returns one ``(N, 6)`` float32 array per frame holding
+    ``x1, y1, x2, y2, confidence, class_id`` in that frame's pixels, after
+    confidence filtering and per-class NMS.  ``names`` maps class IDs to
+    class names.  ``quantize`` selects an INT8 model (``"dynamic"`` or
+    ``"static"``, see :mod:`.quantization`); static quantization is
+    calibrated on ``calibration_frames`` frames of ``calibration_video``.
+    """
+
+    names: Dict[int, str]
+
+    def __init__(
+        self,
+        model_path: str,
+        *,
+        device: str = "cpu",
+        conf: float = 0.25,
+        iou: float = 0.45,
+        imgsz: int = 640,
+        quantize: str = "none",
+        calibration_video: Optional[str] = None,
+        calibration_frames: int = 64,
+    ):
+        self.model_path = model_path
+        self.device = device
+        self.conf = conf
+        self.iou = iou
+        self.imgsz = imgsz
+        self.quantize = quantize
+        self.calibration_video = calibration_video
+        self.calibration_frames = calibration_frames
+
+    def predict(
+        self, frames: Sequence[np.ndarray], imgsz: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """Detections per frame; ``imgsz`` overrides the inference size."""
+        raise NotImplementedError
+
+
+class UltralyticsBackend(InferenceBackend):
+    """The ``ultralytics`` package with its PyTorch runtime."""
+
+    def __init__(self, model_path: str, **kwargs):
+        super().__init__(model_path, **kwargs)
+        if self.quantize != "none":
+            raise ValueError("INT8 quantization needs an ONNX backend (onnxruntime, opencv)")
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def predict(
+        self, frames: Sequence[np.ndarray], imgsz: Optional[int] = None
+    ) -> List[np.ndarray]:
+        results = self.model(
+            list(frames),
+            conf=self.conf,
+            iou=self.iou,
+            imgsz=imgsz or self.imgsz,
+            device=self.device,
+            verbose=False,
+        )
+        return [
+            result.boxes.data.cpu().numpy()
+            if result.boxes is not None
+            else np.zeros((0, 6), np.float32)
+            for result in results
+        ]
+
+
+class OnnxBackend(InferenceBackend):
+    """Shared pre- and post-processing for exported YOLOv8 ONNX graphs.
+
+    Frames are letterboxed the way Ultralytics does: a batch of equally
+    sized frames is scaled so the long side is ``imgsz`` and the short side
+    padded to a multiple of the stride (a 16:9 proxy runs at 640x384
+    instead of 640x640); frames of mixed sizes each go into an
+    ``imgsz`` x ``imgsz`` square.
+    """
+
+    stride = 32
+
+    def __init__(self, model_path: str, **kwargs):
+        super().__init__(model_path, **kwargs)
+        self.onnx_path = onnx_model(model_path, self.imgsz)
+        self.names = load_names(self.onnx_path)
+        if self.quantize != "none":
+            self.onnx_path = quantize_model(
+                self.onnx_path, self.quantize, self._calibration_blobs
+            )
+
+    def _calibration_blobs(self) -> Iterable[np.ndarray]:
+        if not self.calibration_video:
+            raise ValueError("Static quantization needs calibration_video")
+        for frame in sample_frames(self.calibration_video, self.calibration_frames):
+            yield self._preprocess([frame], self.imgsz)[0]
+
+    def predict(
+        self, frames: Sequence[np.ndarray], imgsz: Optional[int] = None
+    ) -> List[np.ndarray]:
+        if not frames:
+            return []
+        blob, geometry = self._preprocess(frames, imgsz or self.imgsz)
+        output = self._forward(blob)      # (B, 4 + classes, anchors)
+        return [
+            self._postprocess(pred, ratio, pad, frame.shape[1::-1])
+            for pred, (ratio, pad), frame in zip(output, geometry, frames)
+        ]
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _preprocess(
+        self, frames: Sequence[np.ndarray], imgsz: int
+    ) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+        shapes = {frame.shape[:2] for frame in frames}
+        if len(shapes) == 1:
+            h, w = frames[0].shape[:2]
+            ratio = min(imgsz / h, imgsz / w)
+            canvas_w = -(-round(w * ratio) // self.stride) * self.stride
+            canvas_h = -(-round(h * ratio) // self.stride) * self.stride
+        else:
+            canvas_w = canvas_h = -(-imgsz // self.stride) * self.stride
+
+        boxed, geometry = [], []
+        for frame in frames:
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            h, w = frame.shape[:2]
+            ratio = min(canvas_w / w, canvas_h / h, imgsz / max(h, w))
+            new_w, new_h = round(w * ratio), round(h * ratio)
+            dw, dh = canvas_w - new_w, canvas_h - new_h
+            left, top = round(dw / 2 - 0.1), round(dh / 2 - 0.1)
+            if (new_w, new_h) != (w, h):
+                frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            boxed.append(
+                cv2.copyMakeBorder(
+                    frame, top, dh - top, left, dw - left,
+                    cv2.BORDER_CONSTANT, value=(114, 114, 114),
+                )
+            )
+            geometry.append((ratio, (left, top)))
+        blob = cv2.dnn.blobFromImages(boxed, 1 / 255.0, swapRB=True)
+        return blob, geometry
+
+    def _postprocess(
+        self,
+        pred: np.ndarray,
+        ratio: float,
+        pad: Tuple[int, int],
+        size: Tuple[int, int],
+    ) -> np.ndarray:
+        scores = pred[4:]
+        class_ids = scores.argmax(axis=0)
+        confs = scores[class_ids, np.arange(scores.shape[1])]
+        keep = confs > self.conf
+        if not keep.any():
+            return np.zeros((0, 6), np.float32)
+        cx, cy, bw, bh = pred[:4, keep]
+        confs, class_ids = confs[keep], class_ids[keep]
+
+        xywh = np.stack([cx - bw / 2, cy - bh / 2, bw, bh], axis=1)
+        # cv2's top_k caps candidates before NMS; cap the survivors instead
+        idx = batched_nms(xywh, confs, class_ids, self.conf, self.iou)[:MAX_DETECTIONS]
+
+        boxes = xywh[idx].copy()
+        boxes[:, 2:] += boxes[:, :2]
+        boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], np.float32)
+        boxes /= ratio
+        boxes[:, 0::2] = boxes[:, 0::2].clip(0, size[0])
+        boxes[:, 1::2] = boxes[:, 1::2].clip(0, size[1])
+        return np.column_stack([boxes, confs[idx], class_ids[idx]]).astype(np.float32)
+
+
+class OnnxRuntimeBackend(OnnxBackend):
+    """ONNX Runtime; CUDA when available and requested, else CPU.
+
+    Intra-op threads follow ``cv2.getNumThreads()`` so chunk-parallel
+    workers keep to their share of the cores.
+    """
+
+    def __init__(self, model_path: str, **kwargs):
+        super().__init__(model_path, **kwargs)
+        import onnxruntime as ort
+
+        providers = ["CPUExecutionProvider"]
+        if self.device == "cuda":
+            providers.insert(0, "CUDAExecutionProvider")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = cv2.getNumThreads()
+        self.session = ort.InferenceSession(
+            self.onnx_path, sess_options=options, providers=providers
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenCVDnnBackend(OnnxBackend):
+    """OpenCV's ``cv2.dnn`` module; no runtime beyond OpenCV itself."""
+
+    def __init__(self, model_path: str, **kwargs):
+        super().__init__(model_path, **kwargs)
+        self.net = cv2.dnn.readNetFromONNX(self.onnx_path)
+        if self.device == "cuda":
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+BACKENDS = {
+    "ultralytics": UltralyticsBackend,
+    "onnxruntime": OnnxRuntimeBackend,
+    "opencv": OpenCVDnnBackend,
+}
+
+
+def names_path(onnx_path: str) -> str:
+    """Class-name sidecar written next to an exported model."""
+    return os.path.splitext(onnx_path)[0] + ".names.json"
+
+
+def onnx_model(model_path: str, imgsz: int = 640) -> str:
+    """Path of the ONNX version of ``model_path``, exporting it once.
+
+    ``.onnx`` paths are used as given.  For PyTorch weights the export is
+    cached next to them (``yolov8n.pt`` -> ``yolov8n.onnx`` plus
+    ``yolov8n.names.json``) and redone only when the weights are newer.
+    The graph has dynamic batch and input size.
+    """
+    if model_path.endswith(".onnx"):
+        return model_path
+    onnx_path = os.path.splitext(model_path)[0] + ".onnx"
+    if (
+        os.path.exists(onnx_path)
+        and os.path.exists(names_path(onnx_path))
+        and (
+            not os.path.exists(model_path)  # hub name, downloaded by Ultralytics
+            or os.path.getmtime(onnx_path) >= os.path.getmtime(model_path)
+        )
+    ):
+        return onnx_path
+
+    from ultralytics import YOLO
+
+    logger.info("Exporting %s to ONNX (one-time)", model_path)
+    model = YOLO(model_path)
+    exported = model.export(
+        format="onnx", imgsz=imgsz, dynamic=True, simplify=False, verbose=False
+    )
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    with open(names_path(onnx_path), "w") as fh:
+        json.dump({str(k): v for k, v in model.names.items()}, fh)
+    return onnx_path
+
+
+def load_names(onnx_path: str) -> Dict[int, str]:
+    """Class names from the sidecar, else from the graph's metadata."""
+    sidecar = names_path(onnx_path)
+    if os.path.exists(sidecar):
+        with open(sidecar) as fh:
+            return {int(k): v for k, v in json.load(fh).items()}
+
+    import onnxruntime as ort
+
+    meta = ort.InferenceSession(
+        onnx_path, providers=["CPUExecutionProvider"]
+    ).get_modelmeta().custom_metadata_map
+    if "names" not in meta:
+        raise ValueError(f"No class names for {onnx_path}; expected {sidecar}")
+    return {int(k): v for k, v in ast.literal_eval(meta["names"]).items()}
+
+
+def resolve_device(device: str, backend: str) -> str:
+    """Map ``"auto"`` to ``"cuda"`` if ``backend`` can use a GPU here, else ``"cpu"``."""
+    if device != "auto":
+        return device
+    try:
+        if backend == "ultralytics":
+            import torch
+
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        if backend == "onnxruntime":
+            import onnxruntime as ort
+
+            return "cuda" if "CUDAExecutionProvider" in ort.get_available_providers() else "cpu"
+        if backend == "opencv":
+            return "cuda" if cv2.cuda.getCudaEnabledDeviceCount() > 0 else "cpu"
+    except (ImportError, AttributeError, cv2.error):
+        pass
+    return "cpu"
+
+
+def open_backend(backend: str, model_path: str, **kwargs) -> InferenceBackend:
+    """Create a backend by name (``"ultralytics"``, ``"onnxruntime"``, ``"opencv"``)."""
+    try:
+        cls = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend: {backend}") from None
+    return cls(model_path, **kwargs)
@@ -0,0 +1,142 @@
+# core/keyframe_index.py
+"""Keyframe / PTS index of a video, persisted as a sidecar next to it."""
+
+import logging
+import os
+import subprocess
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = ".kfidx.npz"
+INDEX_VERSION = 2   # bump when the parsing changes; older sidecars are rebuilt
+
+
+class KeyframeIndex:
+    """Presentation timestamps of every frame plus the keyframe positions.
+
+    Built once per file from a demux-only ffmpeg pass (no decoding), so a
+    seek becomes a binary search for the preceding keyframe followed by a
+    bounded decode-forward.
+    """
+
+    def __init__(self, pts: np.ndarray, keyframes: np.ndarray, time_base: float):
+        self.pts = pts                # int64, presentation order
+        self.keyframes = keyframes    # frame indices of keyframes, ascending
+        self.time_base = time_base
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def frame_time(self, frame_idx: int) -> float:
+        """Seconds from the first frame to ``frame_idx``."""
+        return float(self.pts[frame_idx] - self.pts[0]) * self.time_base
+
+    def frame_at(self, seconds: float) -> int:
+        """Index of the last frame shown at or before ``seconds``."""
+        target = self.pts[0] + seconds / self.time_base
+        return max(0, int(np.searchsorted(self.pts, target, side="right")) - 1)
+
+    def keyframe_before(self, frame_idx: int) -> int:
+        """Frame index of the nearest keyframe at or before ``frame_idx``."""
+        if not len(self.keyframes):
+            return 0
+        pos = int(np.searchsorted(self.keyframes, frame_idx, side="right")) - 1
+        return int(self.keyframes[max(pos, 0)])
+
+    # ─────────── building & persistence ───────────
+    @classmethod
+    def build(cls, video_path: str) -> "KeyframeIndex":
+        """Probe ``video_path`` with ``ffmpeg -c copy -f framecrc``."""
+        import imageio_ffmpeg
+
+        out = subprocess.run(
+            [
+                imageio_ffmpeg.get_ffmpeg_exe(), "-v", "error", "-nostdin",
+                "-i", video_path, "-map", "0:v:0", "-c", "copy",
+                "-f", "framecrc", "-",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout.decode("ascii", "replace")
+
+        time_base = 1.0
+        pts, key_pts = [], []
+        for line in out.splitlines():
+            if line.startswith("#tb 0:"):
+                num, den = line.split(":", 1)[1].strip().split("/")
+                time_base = int(num) / int(den)
+                continue
+            if not line or line.startswith("#"):
+                continue
+            # stream, dts, pts, duration, size, crc[, F=0xNN][, S=side data...]
+            cols = [c.strip() for c in line.split(",")]
+            if cols[0] != "0":
+                continue
+            p = int(cols[2])
+            pts.append(p)
+            # framecrc omits F= exactly when the flags are AV_PKT_FLAG_KEY (1)
+            flags = next((int(c[2:], 16) for c in cols[6:] if c.startswith("F=")), 1)
+            if flags & 1:
+                key_pts.append(p)
+
+        if pts and not key_pts:
+            logger.warning("No keyframes found in %s; seeks decode from the start", video_path)
+
+        pts_arr = np.array(sorted(pts), dtype=np.int64)
+        keyframes = np.searchsorted(pts_arr, np.array(sorted(key_pts), dtype=np.int64))
+        return cls(pts_arr, keyframes.astype(np.int64), time_base)
+
+    @staticmethod
+    def sidecar_path(video_path: str) -> str:
+        return video_path + SIDECAR_SUFFIX
+
+    def save(self, video_path: str) -> None:
+        st = os.stat(video_path)
+        with open(self.sidecar_path(video_path), "wb") as fh:
+            np.savez_compressed(
+                fh,
+                pts=self.pts,
+                keyframes=self.keyframes,
+                time_base=self.time_base,
+                source_mtime_ns=st.st_mtime_ns,
+                source_size=st.st_size,
+                version=INDEX_VERSION,
+            )
+
+    @classmethod
+    def load(cls, video_path: str) -> Optional["KeyframeIndex"]:
+        """Read the sidecar, or ``None`` if missing or stale."""
+        path = cls.sidecar_path(video_path)
+        if not os.path.exists(path):
+            return None
+        st = os.stat(video_path)
+        with np.load(path) as data:
+            if (
+                "version" not in data
+                or int(data["version"]) != INDEX_VERSION
+                or int(data["source_mtime_ns"]) != st.st_mtime_ns
+                or int(data["source_size"]) != st.st_size
+            ):
+                return None
+            return cls(data["pts"], data["keyframes"], float(data["time_base"]))
+
+
+def load_or_build_index(video_path: str) -> KeyframeIndex:
+    """Return the cached index for ``video_path``, probing it on first use."""
+    index = KeyframeIndex.load(video_path)
+    if index is not None:
+        return index
+
+    index = KeyframeIndex.build(video_path)
+    logger.info(
+        "Indexed %s: %d frames, %d keyframes", video_path, len(index), len(index.keyframes)
+    )
+    try:
+        index.save(video_path)
+    except OSError as exc:
+        logger.warning("Could not write keyframe index sidecar: %s", exc)
+    return index
@@ -0,0 +1,152 @@
+# core/motion_crops.py
+"""Detection crops around motion blobs, cut from the full-resolution frame."""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.detection_models import DetectionBatch
+from .geometry import batched_nms
+from .motion_detector import MotionBlobs
+
+logger = logging.getLogger(__name__)
+
+
+def _area(boxes: np.ndarray) -> np.ndarray:
+    return (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+
+
+def _union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.minimum(a[:2], b[:2]), np.maximum(a[2:], b[2:])])
+
+
+def merge_boxes(
+    boxes: np.ndarray,
+    frame_size: Tuple[int, int],
+    *,
+    padding: float,
+    min_size: int,
+    max_crops: int,
+) -> np.ndarray:
+    """Padded, non-overlapping crop boxes covering all of ``boxes``.
+
+    Each box grows by ``padding`` times its longer side on every side and
+    to at least ``min_size`` square, clipped to ``frame_size`` (w, h).
+    Overlapping boxes are replaced by their union until none overlap; then
+    the pair whose union adds the least area is merged until at most
+    ``max_crops`` remain.
+    """
+    w, h = frame_size
+    boxes = np.asarray(boxes, np.float32).reshape(-1, 4)
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    sides = boxes[:, 2:] - boxes[:, :2]
+    half = np.maximum(sides / 2 + padding * sides.max(axis=1, keepdims=True), min_size / 2)
+    crops = np.concatenate([centers - half, centers + half], axis=1)
+    crops = list(np.clip(crops, 0, [w, h, w, h]))
+
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(crops)):
+            for j in range(i + 1, len(crops)):
+                a, b = crops[i], crops[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    crops[i] = _union(a, b)
+                    del crops[j]
+                    merged = True
+                    break
+            if merged:
+                break
+
+    while len(crops) > max_crops:
+        best = None
+        for i in range(len(crops)):
+            for j in range(i + 1, len(crops)):
+                growth = _area(_union(crops[i], crops[j])) - _area(crops[i]) - _area(crops[j])
+                if best is None or growth < best[0]:
+                    best = (growth, i, j)
+        _, i, j = best
+        crops[i] = _union(crops[i], crops[j])
+        del crops[j]
+    return np.array(crops, np.float32).reshape(-1, 4)
+
+
+class MotionCrops:
+    """Crops of one frame to run the detector on instead of the whole frame.
+
+    ``boxes`` are in detection-frame pixels (the analysis proxy, or its
+    region crop); ``images`` are the same areas cut from the decoded frame,
+    which has ``factor`` (fx, fy) times the proxy resolution and in which
+    the detection frame starts at ``origin`` proxy pixels.
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        frame: np.ndarray,
+        origin: Sequence[float] = (0, 0),
+        factor: Sequence[float] = (1.0, 1.0),
+    ):
+        self.boxes = boxes
+        self.origin = np.array([origin[0], origin[1]] * 2, np.float32)
+        self.factor = np.array([factor[0], factor[1]] * 2, np.float32)
+        h, w = frame.shape[:2]
+        source = np.round((boxes + self.origin) * self.factor).astype(np.int32)
+        self.source_boxes = np.clip(source, 0, [w, h, w, h])
+        self.images: List[np.ndarray] = [
+            frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.source_boxes
+        ]
+
+    @classmethod
+    def plan(
+        cls,
+        blobs: MotionBlobs,
+        det_size: Tuple[int, int],
+        frame: np.ndarray,
+        config,
+        origin: Sequence[float] = (0, 0),
+        factor: Sequence[float] = (1.0, 1.0),
+        tracked: Optional[np.ndarray] = None,
+    ) -> Optional["MotionCrops"]:
+        """Crops for ``blobs``, or ``None`` to detect on the full frame.
+
+        ``tracked`` boxes (detection-frame px) of objects being tracked get
+        crops too, so objects that stop moving are still detected.  The
+        full frame is used when there are no blobs (holdover and keep-alive
+        frames, which look for new objects) or when the crops would cover
+        more than ``crop_max_coverage`` of it.
+        """
+        if not len(blobs.boxes):
+            return None
+        boxes = blobs.boxes
+        if tracked is not None and len(tracked):
+            boxes = np.concatenate([boxes, tracked])
+        boxes = merge_boxes(
+            boxes,
+            det_size,
+            padding=config.crop_padding,
+            min_size=config.crop_min_size,
+            max_crops=config.crop_max_crops,
+        )
+        if _area(boxes).sum() > config.crop_max_coverage * det_size[0] * det_size[1]:
+            return None
+        return cls(boxes, frame, origin, factor)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def to_frame(self, batch: DetectionBatch, iou: float) -> DetectionBatch:
+        """Map detections on the crops to detection-frame pixels.
+
+        ``batch.frame_idx`` is the crop index.  Objects cut by a crop edge
+        can be found in two crops; per-class NMS across crops keeps one.
+        """
+        offset = self.source_boxes[batch.frame_idx, :2]
+        xyxy = (batch.xyxy + np.tile(offset, 2)) / self.factor - self.origin
+        batch = DetectionBatch(xyxy, batch.conf, batch.class_id, batch.frame_idx, batch.names)
+        if len(self.boxes) < 2 or len(batch) < 2:
+            return batch
+        xywh = np.concatenate([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+        keep = batched_nms(xywh, batch.conf, batch.class_id, 0.0, iou)
+        return batch.select(np.sort(keep))
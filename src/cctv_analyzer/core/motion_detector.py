@@ -2,12 +2,42 @@
 """Motion detection module using background subtraction."""
 
 import cv2
+import math
 import numpy as np
-from typing import List, Dict
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 import logging
 
+from ..models.detection_models import DetectionBatch
+from .background_model import BackgroundModel
+
 logger = logging.getLogger(__name__)
 
+BACKGROUND_SAMPLES = 15
+MOTION_NAMES = {0: "motion"}             # class of blobs used as detections
+
+
+class MotionBlobs(NamedTuple):
+    """Moving regions of one frame, in analysis-frame pixels."""
+
+    boxes: np.ndarray        # (K, 4) float32 x1, y1, x2, y2
+    areas: np.ndarray        # (K,) float32 contour area
+
+    @classmethod
+    def empty(cls) -> "MotionBlobs":
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32))
+
+    def to_batch(self, frame_idx: int = 0) -> DetectionBatch:
+        """The blobs as class-agnostic ``"motion"`` detections (confidence 1)."""
+        n = len(self.boxes)
+        return DetectionBatch(
+            self.boxes,
+            np.ones(n, np.float32),
+            np.zeros(n, np.int32),
+            np.full(n, frame_idx, np.int64),
+            MOTION_NAMES,
+        )
+
 
 class MotionDetector:
     """Handles motion detection using various background subtraction algorithms."""
@@ -20,6 +50,16 @@ class MotionDetector:
             cv2.MORPH_ELLIPSE,
             (config.morphology_kernel_size, config.morphology_kernel_size),
         )
+        self._fg: Optional[np.ndarray] = None
+        self.blobs = MotionBlobs.empty()
+        self._learning_rate = -1.0          # OpenCV default schedule
+        self._last_frame: Optional[np.ndarray] = None
+        self.frames_seen = 0
+        # frames spread over the last `history` frames, for snapshot()
+        self._bg_samples: Optional[deque] = (
+            deque(maxlen=BACKGROUND_SAMPLES) if config.background_dir else None
+        )
+        self._bg_interval = max(1, config.history // BACKGROUND_SAMPLES)
 
     def _create_background_subtractor(self):
         """Create background subtractor based on configuration."""
@@ -38,58 +78,231 @@ class MotionDetector:
         else:
             raise ValueError(f"Unknown algorithm: {self.config.algorithm}")
 
-    def detect_motion(self, frames: List[np.ndarray]) -> Dict:
-        """Detect motion in a sequence of frames."""
+    def prime(self, model: BackgroundModel) -> None:
+        """Warm-start the background model from a saved :class:`BackgroundModel`.
+
+        Instead of replaying hundreds of frames, the subtractor is
+        initialised on the background image and then fed ``prime_steps``
+        copies of it with the saved per-pixel noise added, so the variances
+        start near their learned values.  Afterwards the model adapts at its
+        steady-state rate (``1 / history``) rather than the fast start-up
+        schedule.
+        """
+        bs = self.bg_subtractor
+        image = model.image
+        sigma = model.noise_sigma.astype(np.float32)
+        self._allocate(image.shape[:2])
+
+        mog2 = hasattr(bs, "setVarInit")
+        if mog2:
+            # start every mode at the scene's noise level, and let noisy
+            # priming samples refine that mode instead of spawning new ones
+            saved = bs.getVarInit(), bs.getVarThresholdGen()
+            bs.setVarInit(max(float(np.percentile(sigma ** 2, 90)), saved[0]))
+            bs.setVarThresholdGen(float(self.config.var_threshold))
+
+        bs.apply(image, self._fg, 1.0)
+        rng = np.random.default_rng(0)
+        noisy = np.empty(image.shape, np.float32)
+        for step in range(1, self.config.prime_steps + 1):
+            rng.standard_normal(image.shape, dtype=np.float32, out=noisy)
+            noisy *= sigma
+            noisy += image
+            bs.apply(np.clip(noisy, 0, 255).astype(np.uint8), self._fg, 1.0 / (step + 1))
+
+        if mog2:
+            bs.setVarInit(saved[0])
+            bs.setVarThresholdGen(saved[1])
+        self._learning_rate = 1.0 / self.config.history
+
+    def snapshot(self) -> Optional[BackgroundModel]:
+        """Background image and noise level for :meth:`prime`.
+
+        Both come from frames sampled over the last ``history`` frames
+        (kept only when ``background_dir`` is set): the per-pixel median,
+        which objects passing through do not bleed into the way they do
+        into the subtractor's own blended background, and the per-pixel
+        median absolute deviation, so noisy areas such as foliage prime
+        with a matching variance.
+        """
+        if not self._bg_samples:
+            return None
+        samples = [f for f in self._bg_samples if f.shape == self._last_frame.shape]
+        if not samples:
+            return None
+        stack = np.stack(samples).astype(np.float32)
+        median = np.median(stack, axis=0)
+        # per-pixel noise: scaled median absolute deviation over the samples
+        sigma = 1.4826 * np.median(np.abs(stack - median), axis=0)
+        return BackgroundModel(
+            image=median.astype(np.uint8),
+            noise_sigma=np.maximum(sigma, 1.0).astype(np.float16),
+            frames_seen=self.frames_seen,
+            algorithm=self.config.algorithm,
+        )
+
+    def detect_motion(
+        self, frames: Iterable[np.ndarray], keep_masks: bool = True
+    ) -> Dict:
+        """Detect motion in a sequence of frames.
+
+        ``frames`` may be any iterable, including a streaming frame source.
+        Pass ``keep_masks=False`` to avoid holding one mask per frame.
+        """
         motion_masks = []
         motion_scores = []
 
-        logger.info("Processing %d frames for motion detection", len(frames))
-
         for frame in frames:
-            fg_mask = self.bg_subtractor.apply(frame)
+            if keep_masks:
+                filtered_mask, motion_score = self.process_frame(frame)
+                motion_masks.append(filtered_mask)
+            else:
+                motion_score = self.score_frame(frame)
+            motion_scores.append(motion_score)
 
-            if self.config.detect_shadows:
-                fg_mask[fg_mask == 127] = 0
+        logger.info("Processed %d frames for motion detection", len(motion_scores))
+        return self.summarize(motion_scores, motion_masks)
 
-            fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, self.kernel)
-            fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.kernel)
+    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Update the background model with one frame.
 
-            contours, _ = cv2.findContours(
-                fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-            )
-            filtered_mask = np.zeros_like(fg_mask)
+        Returns the area-filtered foreground mask and the motion score
+        (fraction of the frame covered by moving blobs).
+        """
+        motion_score = self.score_frame(frame)
+        return self.filtered_mask(), motion_score
 
-            for contour in contours:
-                if cv2.contourArea(contour) >= self.config.min_area:
-                    cv2.fillPoly(filtered_mask, [contour], 255)
+    def score_frame(self, frame: np.ndarray) -> float:
+        """Allocation-free per-frame path: update the model, return the score.
 
-            motion_score = np.sum(filtered_mask > 0) / (
-                filtered_mask.shape[0] * filtered_mask.shape[1]
-            )
+        Works in buffers allocated once per frame size and leaves the boxes
+        of the moving blobs in :attr:`blobs`; the filtered mask is only
+        materialised on request (:meth:`filtered_mask`).
+        """
+        if self._fg is None or self._fg.shape != frame.shape[:2]:
+            self._allocate(frame.shape[:2])
+        self.bg_subtractor.apply(frame, self._fg, self._learning_rate)
+        self._last_frame = frame
+        if self._bg_samples is not None and self.frames_seen % self._bg_interval == 0:
+            self._bg_samples.append(frame.copy())
+        self.frames_seen += 1
+        return self._score_foreground()
 
-            motion_masks.append(filtered_mask)
-            motion_scores.append(motion_score)
+    def _score_foreground(self) -> float:
+        fg, filled = self._fg, self._filled
+        if self.config.detect_shadows:
+            # shadows are marked 127, foreground 255
+            cv2.threshold(fg, 200, 255, cv2.THRESH_BINARY, dst=fg)
+        cv2.morphologyEx(fg, cv2.MORPH_CLOSE, self.kernel, dst=filled)
+        cv2.morphologyEx(filled, cv2.MORPH_OPEN, self.kernel, dst=fg)
+
+        contours, _ = cv2.findContours(fg, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        kept, areas = [], []
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area >= self.config.min_area:
+                kept.append(contour)
+                areas.append(area)
+
+        filled.fill(0)
+        if not kept:
+            self.blobs = MotionBlobs.empty()
+            return 0.0
 
-        motion_events = self._adaptive_threshold(motion_scores)
+        cv2.fillPoly(filled, kept, 255)
+        boxes = np.array([cv2.boundingRect(c) for c in kept], dtype=np.float32)
+        boxes[:, 2:] += boxes[:, :2]
+        self.blobs = MotionBlobs(boxes, np.array(areas, dtype=np.float32))
+        return cv2.countNonZero(filled) / filled.size
 
+    def filtered_mask(self) -> np.ndarray:
+        """Filled mask of the blobs kept for the last frame (a copy)."""
+        return self._filled.copy()
+
+    def _allocate(self, shape: Tuple[int, int]) -> None:
+        self._fg = np.zeros(shape, np.uint8)
+        self._filled = np.zeros(shape, np.uint8)
+
+    def summarize(
+        self, motion_scores: List[float], motion_masks: Optional[List] = None
+    ) -> Dict:
+        """Build the motion-data dict consumed by ``EventAnalyzer``."""
         return {
-            "motion_masks": motion_masks,
+            "motion_masks": motion_masks if motion_masks is not None else [],
             "motion_scores": motion_scores,
-            "motion_events": motion_events,
+            "motion_events": self._adaptive_threshold(motion_scores),
         }
 
     def _adaptive_threshold(
-        self, motion_scores: List[float], window_size: int = 30
+        self, motion_scores: List[float], window_size: Optional[int] = None
     ) -> List[bool]:
         """Apply adaptive thresholding for motion detection."""
-        motion_events = []
-        for i in range(len(motion_scores)):
-            start_idx = max(0, i - window_size)
-            end_idx = min(len(motion_scores), i + window_size)
-            local_scores = motion_scores[start_idx:end_idx]
-            local_mean = np.mean(local_scores)
-            local_std = np.std(local_scores)
-            threshold = local_mean + 2 * local_std
-            is_motion = motion_scores[i] > max(threshold, 0.01)
-            motion_events.append(is_motion)
-        return motion_events
\ No newline at end of file
+        window = window_size or self.config.adaptive_window
+        if self.config.causal_threshold:
+            causal = CausalThreshold(window)
+            return [causal.update(score) for score in motion_scores]
+        return rolling_threshold(motion_scores, window).tolist()
+
+
+def rolling_threshold(
+    motion_scores: Sequence[float],
+    window_size: int,
+    n_std: float = 2.0,
+    floor: float = 0.01,
+) -> np.ndarray:
+    """Flag scores above ``mean + n_std * std`` of their local window.
+
+    The window of score ``i`` is ``[i - window_size, i + window_size)``,
+    clipped to the sequence.  Window sums come from cumulative sums, so the
+    whole sequence is thresholded in O(n) regardless of the window size.
+    """
+    scores = np.asarray(motion_scores, dtype=np.float64)
+    n = len(scores)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    # variance is shift-invariant; centring keeps E[x²] - E[x]² well conditioned
+    centred = scores - scores.mean()
+    csum = np.concatenate(([0.0], np.cumsum(centred)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(centred * centred)))
+
+    idx = np.arange(n)
+    lo = np.maximum(0, idx - window_size)
+    hi = np.minimum(n, idx + window_size)
+    count = hi - lo
+
+    mean = (csum[hi] - csum[lo]) / count
+    var = np.maximum((csum_sq[hi] - csum_sq[lo]) / count - mean * mean, 0.0)
+    threshold = mean + scores.mean() + n_std * np.sqrt(var)
+    return scores > np.maximum(threshold, floor)
+
+
+class CausalThreshold:
+    """Streaming counterpart of :func:`rolling_threshold`.
+
+    Keeps running sums over the last ``2 * window_size`` scores (the same
+    width as the centred window), so each update is O(1).
+    """
+
+    def __init__(
+        self, window_size: int, n_std: float = 2.0, floor: float = 0.01
+    ):
+        self.window = deque(maxlen=2 * window_size)
+        self.n_std = n_std
+        self.floor = floor
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def update(self, score: float) -> bool:
+        if len(self.window) == self.window.maxlen:
+            old = self.window[0]
+            self._sum -= old
+            self._sum_sq -= old * old
+        self.window.append(score)
+        self._sum += score
+        self._sum_sq += score * score
+
+        count = len(self.window)
+        mean = self._sum / count
+        std = math.sqrt(max(self._sum_sq / count - mean * mean, 0.0))
+        return score > max(mean + self.n_std * std, self.floor)
@@ -2,11 +2,12 @@
 """Object detection module using YOLO."""
 
 import logging
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 
-import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from ..models.detection_models import DetectionBatch
+from .inference_backends import open_backend, resolve_device
 
 logger = logging.getLogger(__name__)
 
@@ -17,65 +18,107 @@ class ObjectDetector:
     def __init__(self, config):
         """Initialize object detector with configuration."""
         self.config = config
-        self.model = YOLO(config.model)
+        self.device = resolve_device(config.device, config.backend)
+        self.backend = open_backend(
+            config.backend,
+            config.model,
+            device=self.device,
+            conf=config.confidence_threshold,
+            iou=config.nms_threshold,
+            imgsz=config.imgsz,
+            quantize=config.quantize,
+            calibration_video=config.calibration_video,
+            calibration_frames=config.calibration_frames,
+        )
+        self.names = self.backend.names
         self.relevant_classes = set(config.relevant_classes)
-        logger.info("Loaded YOLO model: %s", config.model)
-
-    def detect_objects(self, frames: List[np.ndarray]) -> List[List[Dict]]:
-        """Detect objects in a sequence of frames."""
+        self.relevant_ids = np.array(
+            [i for i, name in self.names.items() if name in self.relevant_classes],
+            np.int32,
+        )
+        logger.info(
+            "Loaded YOLO model %s (%s backend, %s%s)",
+            config.model,
+            config.backend,
+            self.device,
+            "" if config.quantize == "none" else f", INT8 {config.quantize}",
+        )
+
+    def detect_objects(self, frames: Iterable[np.ndarray]) -> List[List[Dict]]:
+        """Detect objects in a sequence of frames.
+
+        ``frames`` may be any iterable, including a streaming frame source;
+        it is consumed ``batch_size`` frames at a time.
+        """
         all_detections: List[List[Dict]] = []
-        logger.info("Processing %d frames for object detection", len(frames))
-
+        batch: List[np.ndarray] = []
         for frame in frames:
-            results = self.model(
-                frame,
-                conf=self.config.confidence_threshold,
-                iou=self.config.nms_threshold,
-                device=self.config.device,
-                verbose=False,
-            )
-
-            frame_detections: List[Dict] = []
-
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-                        class_name = self.model.names[class_id]
-
-                        if class_name in self.relevant_classes:
-                            frame_detections.append(
-                                {
-                                    "bbox": [float(x1), float(y1), float(x2), float(y2)],
-                                    "confidence": confidence,
-                                    "class": class_name,
-                                    "class_id": class_id,
-                                    "area": (x2 - x1) * (y2 - y1),
-                                }
-                            )
-
-            all_detections.append(frame_detections)
-
+            batch.append(frame)
+            if len(batch) == self.config.batch_size:
+                all_detections.extend(self.detect_batch(batch))
+                batch = []
+        if batch:
+            all_detections.extend(self.detect_batch(batch))
+        logger.info("Processed %d frames for object detection", len(all_detections))
         return all_detections
 
-    def get_detection_summary(self, detections: List[List[Dict]]) -> Dict:
-        """Get summary statistics of detections."""
-        total_detections = sum(len(frame) for frame in detections)
-        class_counts: Dict[str, int] = {}
-
-        for frame_detections in detections:
-            for det in frame_detections:
-                class_name = det["class"]
-                class_counts[class_name] = class_counts.get(class_name, 0) + 1
+    def detect_frame(self, frame: np.ndarray) -> List[Dict]:
+        """Detect relevant objects in a single frame."""
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Dict]]:
+        """Per-frame detection dicts for several frames (see ``detect``)."""
+        batch = self.detect(frames)
+        return [batch.for_frame(i).to_dicts() for i in range(len(frames))]
+
+    def detect(
+        self,
+        frames: Sequence[np.ndarray],
+        frame_indices: Optional[Sequence[int]] = None,
+        imgsz: Optional[int] = None,
+    ) -> DetectionBatch:
+        """Detect relevant objects in several frames with one model call.
+
+        The backend letterboxes the list into a single input tensor, so the
+        per-call overhead is paid once per batch.  Equally sized frames
+        share a rectangular input; mixed sizes each get a square one.
+        Class filtering is a single mask over all boxes of the batch; rows
+        carry ``frame_indices[i]`` (default ``i``) for the frame they came
+        from.  ``imgsz`` overrides the configured inference size.
+        """
+        if not frames:
+            return DetectionBatch.empty(self.names)
+        if frame_indices is None:
+            frame_indices = range(len(frames))
+        batch = DetectionBatch.concat(
+            [
+                DetectionBatch.from_array(data, frame_idx, self.names)
+                for data, frame_idx in zip(self.backend.predict(frames, imgsz), frame_indices)
+            ],
+            self.names,
+        )
+        return batch.with_classes(self.relevant_ids)
+
+    def get_detection_summary(
+        self, detections: Sequence[Union[DetectionBatch, List[Dict]]]
+    ) -> Dict:
+        """Get summary statistics of per-frame detections."""
+        batch = DetectionBatch.concat(
+            [
+                d if isinstance(d, DetectionBatch) else DetectionBatch.from_dicts(d)
+                for d in detections
+            ],
+            self.names,
+        )
+        class_ids, counts = np.unique(batch.class_id, return_counts=True)
 
         return {
-            "total_detections": total_detections,
-            "frames_with_detections": sum(1 for frame in detections if frame),
-            "class_counts": class_counts,
-            "average_detections_per_frame": total_detections / len(detections)
+            "total_detections": len(batch),
+            "frames_with_detections": sum(1 for frame in detections if len(frame)),
+            "class_counts": {
+                batch.names[int(c)]: int(n) for c, n in zip(class_ids, counts)
+            },
+            "average_detections_per_frame": len(batch) / len(detections)
             if detections
             else 0,
         }
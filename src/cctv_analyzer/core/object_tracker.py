@@ -2,38 +2,165 @@
 """Object tracking module using IoU-based tracking."""
 
 import logging
-from collections import defaultdict
-from typing import Dict, List
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Union
 
 import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from ..models.detection_models import DetectionBatch
+from .geometry import iou_matrix, pair_iou
 
 logger = logging.getLogger(__name__)
 
+GRID_MIN_PAIRS = 4096   # track x detection pairs below which the dense IoU matrix is cheaper
+
+
+def _grid_cells(boxes: np.ndarray, cell: float):
+    """(box index, cell key) for every grid cell each box touches."""
+    lo = np.floor(boxes[:, :2] / cell).astype(np.int64)
+    span = np.floor(boxes[:, 2:] / cell).astype(np.int64) - lo + 1
+    span = np.maximum(span, 1)
+    counts = span[:, 0] * span[:, 1]
+    owner = np.repeat(np.arange(len(boxes)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cx = lo[owner, 0] + k % span[owner, 0]
+    cy = lo[owner, 1] + k // span[owner, 0]
+    return owner, ((cx + (1 << 20)) << 32) | (cy + (1 << 20))
+
+
+def grid_pairs(a: np.ndarray, b: np.ndarray, cell: float = 0.0):
+    """Indices ``(i, j)`` of the boxes ``a[i]``, ``b[j]`` that share a grid cell.
+
+    Each box is bucketed into every cell of a uniform ``cell``-pixel grid
+    it touches.  Overlapping boxes always share a cell, so no pair with a
+    non-zero IoU is missed, while boxes far apart are never compared.
+    ``cell`` 0 picks twice the median box side.
+    """
+    if not len(a) or not len(b):
+        empty = np.zeros(0, np.int64)
+        return empty, empty
+    if cell <= 0:
+        sides = np.concatenate([a[:, 2:] - a[:, :2], b[:, 2:] - b[:, :2]]).max(axis=1)
+        cell = max(2.0 * float(np.median(sides)), 1.0)
+    rows, a_keys = _grid_cells(a, cell)
+    b_idx, b_keys = _grid_cells(b, cell)
+    order = np.argsort(b_keys, kind="stable")
+    b_idx, b_keys = b_idx[order], b_keys[order]
+    start = np.searchsorted(b_keys, a_keys, "left")
+    n = np.searchsorted(b_keys, a_keys, "right") - start
+    rows = np.repeat(rows, n)
+    pos = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(start, n)
+    # a pair sharing several cells is listed once
+    code = np.unique(rows * len(b) + b_idx[pos])
+    return code // len(b), code % len(b)
+
+
+def _batch_entries(batch: DetectionBatch) -> Callable[[int], Dict]:
+    """Builds the dict entry of one row of ``batch`` (as ``to_dicts`` does) on demand."""
+    xyxy = batch.xyxy.tolist()
+    conf = batch.conf.tolist()
+    class_id = batch.class_id.tolist()
+
+    def entry(j: int) -> Dict:
+        x1, y1, x2, y2 = xyxy[j]
+        return {
+            "bbox": xyxy[j],
+            "confidence": conf[j],
+            "class": batch.names[class_id[j]],
+            "class_id": class_id[j],
+            "area": (x2 - x1) * (y2 - y1),
+        }
+
+    return entry
+
 
 class ObjectTracker:
-    """Simple IoU-based object tracker."""
+    """Simple IoU-based object tracker.
+
+    Feed it one frame at a time with :meth:`update`.  Each track keeps its
+    entries in a buffer of at most ``max_history`` (oldest dropped).  A
+    track that stays unmatched for more than ``max_disappeared`` observed
+    frames expires; if it reached ``min_track_length`` entries its history
+    is handed out once by :meth:`pop_finished`, otherwise it is dropped.
+    :meth:`finish` ends the stream and returns the remaining tracks too.
+    """
 
     def __init__(self, config):
         self.config = config
         self.next_id = 0
         self.objects: Dict[int, Dict] = {}
         self.disappeared: Dict[int, int] = defaultdict(int)
+        self.histories: Dict[int, Deque[Dict]] = {}
+        self._finished: Dict[int, List[Dict]] = {}
+
+    def update(
+        self,
+        detections: Optional[Union[List[Dict], DetectionBatch]],
+        timestamp: float,
+        frame_idx: int,
+    ) -> Dict[int, Dict]:
+        """Track one frame; return the entries of the tracks seen in it.
+
+        ``None`` marks a frame the detector did not look at: tracks are
+        left untouched instead of being counted as disappeared.  Only
+        tracks matched or started in this frame are returned, keyed by ID;
+        each entry is the detection plus ``id``, ``timestamp``,
+        ``frame_idx`` and ``centroid``.  A :class:`DetectionBatch` is
+        matched on its columns; dict entries are built only for the
+        detections written to a track.
+        """
+        if detections is None:
+            return {}
+        if isinstance(detections, DetectionBatch):
+            boxes = detections.xyxy.astype(np.float64)
+            entry = _batch_entries(detections)
+        else:
+            boxes = np.array([det["bbox"] for det in detections], np.float64).reshape(-1, 4)
+
+            def entry(j: int) -> Dict:
+                return detections[j].copy()
+
+        seen: Dict[int, Dict] = {}
+        for obj_id in self._update_tracks(boxes, entry):
+            track = self.objects[obj_id].copy()
+            track["timestamp"] = timestamp
+            track["frame_idx"] = frame_idx
+            track["centroid"] = self._get_centroid(track["bbox"])
+            self.histories[obj_id].append(track)
+            seen[obj_id] = track
+        return seen
+
+    def pop_finished(self) -> Dict[int, List[Dict]]:
+        """Histories of tracks that expired since the last call."""
+        finished, self._finished = self._finished, {}
+        return finished
+
+    def finish(self) -> Dict[int, List[Dict]]:
+        """End the stream: expire every live track, return all unclaimed histories."""
+        for obj_id in list(self.objects):
+            self._deregister(obj_id)
+        return self.pop_finished()
 
     def track_objects(
-        self, detections: List[List[Dict]], timestamps: List[float]
+        self,
+        detections: Iterable[Optional[Union[List[Dict], DetectionBatch]]],
+        timestamps: Iterable[float],
     ) -> Dict[int, List[Dict]]:
-        """Track objects across frames and build history."""
-        history: Dict[int, List[Dict]] = defaultdict(list)
+        """Track a sequence of frames and return its history.
 
+        Batch form of :meth:`update`, consumed lazily, with frames numbered
+        from 0.  Tracks carry over between calls, but only entries of this
+        call are returned, for tracks with at least ``min_track_length`` of
+        them; histories of expired tracks are discarded.
+        """
+        history: Dict[int, List[Dict]] = defaultdict(list)
         for frame_idx, (frame_dets, ts) in enumerate(zip(detections, timestamps)):
-            tracked = self._update_tracks(frame_dets)
-
-            for obj_id, data in tracked.items():
-                track = data.copy()
-                track["timestamp"] = ts
-                track["frame_idx"] = frame_idx
-                track["centroid"] = self._get_centroid(track["bbox"])
+            for obj_id, track in self.update(frame_dets, ts, frame_idx).items():
                 history[obj_id].append(track)
+        self.pop_finished()
 
         return {
             obj_id: hist
@@ -42,50 +169,43 @@ class ObjectTracker:
         }
 
     # internal helpers
-    def _update_tracks(self, detections: List[Dict]) -> Dict[int, Dict]:
-        if not detections:
+    def _update_tracks(self, boxes: np.ndarray, entry: Callable[[int], Dict]) -> List[int]:
+        """Match detection ``boxes`` (N, 4); IDs of the tracks they were assigned to.
+
+        ``entry(j)`` builds the dict stored for detection ``j``; it is only
+        called for detections that are matched or start a track.
+        """
+        if not len(boxes):
             for obj_id in list(self.disappeared.keys()):
                 self.disappeared[obj_id] += 1
                 if self.disappeared[obj_id] > self.config.max_disappeared:
                     self._deregister(obj_id)
-            return self.objects
+            return []
 
         if not self.objects:
-            for det in detections:
-                self._register(det)
-        else:
-            self._match_detections(detections)
-
-        return self.objects
+            return [self._register(entry(j)) for j in range(len(boxes))]
+        return self._match_detections(boxes, entry)
 
-    def _match_detections(self, detections: List[Dict]):
+    def _match_detections(self, dets: np.ndarray, entry: Callable[[int], Dict]) -> List[int]:
         object_ids = list(self.objects.keys())
-        ious = np.zeros((len(object_ids), len(detections)))
-
-        for i, obj_id in enumerate(object_ids):
-            for j, det in enumerate(detections):
-                ious[i, j] = self._calculate_iou(self.objects[obj_id]["bbox"], det["bbox"])
-
+        tracks = np.array([self.objects[obj_id]["bbox"] for obj_id in object_ids], np.float64)
+        if self.config.grid_gating and len(tracks) * len(dets) >= GRID_MIN_PAIRS:
+            rows, cols = grid_pairs(tracks, dets, self.config.grid_cell_size)
+            pairs = self._assign_sparse(rows, cols, pair_iou(tracks[rows], dets[cols]))
+        else:
+            pairs = self._assign(iou_matrix(tracks, dets))
         used_objects = set()
         used_dets = set()
+        assigned: List[int] = []
 
-        matches = [
-            (i, j, ious[i, j])
-            for i in range(len(object_ids))
-            for j in range(len(detections))
-            if ious[i, j] > self.config.iou_threshold
-        ]
-        matches.sort(key=lambda x: x[2], reverse=True)
-
-        for i, j, _ in matches:
-            if i in used_objects or j in used_dets:
-                continue
+        for i, j in pairs:
             obj_id = object_ids[i]
-            self.objects[obj_id] = detections[j].copy()
+            self.objects[obj_id] = entry(j)
             self.objects[obj_id]["id"] = obj_id
             self.disappeared[obj_id] = 0
             used_objects.add(i)
             used_dets.add(j)
+            assigned.append(obj_id)
 
         # unmatched objects
         for i, obj_id in enumerate(object_ids):
@@ -95,36 +215,94 @@ class ObjectTracker:
                     self._deregister(obj_id)
 
         # unmatched detections
-        for j, det in enumerate(detections):
+        for j in range(len(dets)):
             if j not in used_dets:
-                self._register(det)
+                assigned.append(self._register(entry(j)))
+        return assigned
+
+    def _assign(self, ious: np.ndarray) -> List[tuple]:
+        """(track row, detection column) pairs overlapping above ``iou_threshold``.
+
+        ``"hungarian"`` maximises the total IoU of the pairs; ``"greedy"``
+        takes the best remaining pair first, which can cost a track its
+        match when two objects cross.
+        """
+        threshold = self.config.iou_threshold
+        if self.config.matching == "greedy":
+            rows, cols = np.nonzero(ious > threshold)
+            return self._greedy(rows, cols, ious[rows, cols])
+        if self.config.matching != "hungarian":
+            raise ValueError(f"Unknown matching method: {self.config.matching}")
+        # pairs at or below the threshold must not shape the assignment
+        gain = np.where(ious > threshold, ious, 0.0)
+        rows, cols = linear_sum_assignment(gain, maximize=True)
+        keep = gain[rows, cols] > 0
+        return list(zip(rows[keep].tolist(), cols[keep].tolist()))
+
+    def _assign_sparse(self, rows: np.ndarray, cols: np.ndarray, ious: np.ndarray) -> List[tuple]:
+        """:meth:`_assign` over candidate pairs only (from :func:`grid_pairs`).
+
+        The Hungarian assignment is solved separately for each connected
+        group of tracks and detections linked by pairs above the threshold;
+        no pair links two groups, so together they give the same total IoU
+        as one assignment over the full matrix, at the cost of many small
+        problems instead of one large one.
+        """
+        keep = ious > self.config.iou_threshold
+        rows, cols, ious = rows[keep], cols[keep], ious[keep]
+        if self.config.matching == "greedy":
+            return self._greedy(rows, cols, ious)
+        if self.config.matching != "hungarian":
+            raise ValueError(f"Unknown matching method: {self.config.matching}")
+        if not len(rows):
+            return []
+        # bipartite graph: tracks are nodes 0..R-1, detections follow
+        offset = int(rows.max()) + 1
+        size = offset + int(cols.max()) + 1
+        graph = coo_matrix((np.ones(len(rows)), (rows, offset + cols)), shape=(size, size))
+        _, labels = connected_components(graph, directed=False)
+        group = labels[rows]
+        order = np.argsort(group, kind="stable")
+        pairs = []
+        for idx in np.split(order, np.flatnonzero(np.diff(group[order])) + 1):
+            if len(idx) == 1:
+                pairs.append((int(rows[idx[0]]), int(cols[idx[0]])))
+                continue
+            track_idx, r = np.unique(rows[idx], return_inverse=True)
+            det_idx, c = np.unique(cols[idx], return_inverse=True)
+            gain = np.zeros((len(track_idx), len(det_idx)))
+            gain[r, c] = ious[idx]
+            r, c = linear_sum_assignment(gain, maximize=True)
+            ok = gain[r, c] > 0
+            pairs.extend(zip(track_idx[r[ok]].tolist(), det_idx[c[ok]].tolist()))
+        return pairs
+
+    @staticmethod
+    def _greedy(rows: np.ndarray, cols: np.ndarray, ious: np.ndarray) -> List[tuple]:
+        order = np.argsort(-ious, kind="stable")
+        used_rows, used_cols, pairs = set(), set(), []
+        for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+            if i not in used_rows and j not in used_cols:
+                used_rows.add(i)
+                used_cols.add(j)
+                pairs.append((i, j))
+        return pairs
 
-    def _register(self, detection: Dict):
-        detection_copy = detection.copy()
-        detection_copy["id"] = self.next_id
-        self.objects[self.next_id] = detection_copy
-        self.disappeared[self.next_id] = 0
+    def _register(self, detection: Dict) -> int:
+        obj_id = self.next_id
+        detection["id"] = obj_id
+        self.objects[obj_id] = detection
+        self.disappeared[obj_id] = 0
+        self.histories[obj_id] = deque(maxlen=self.config.max_history or None)
         self.next_id += 1
+        return obj_id
 
     def _deregister(self, object_id: int):
         self.objects.pop(object_id, None)
         self.disappeared.pop(object_id, None)
-
-    @staticmethod
-    def _calculate_iou(box1: List[float], box2: List[float]) -> float:
-        x1_1, y1_1, x2_1, y2_1 = box1
-        x1_2, y1_2, x2_2, y2_2 = box2
-        x1_inter = max(x1_1, x1_2)
-        y1_inter = max(y1_1, y1_2)
-        x2_inter = min(x2_1, x2_2)
-        y2_inter = min(y2_1, y2_2)
-        if x2_inter <= x1_inter or y2_inter <= y1_inter:
-            return 0.0
-        inter = (x2_inter - x1_inter) * (y2_inter - y1_inter)
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y2_2)
-        union = area1 + area2 - inter
-        return inter / union if union else 0.0
+        history = self.histories.pop(object_id, None)
+        if history is not None and len(history) >= self.config.min_track_length:
+            self._finished[object_id] = list(history)
 
     @staticmethod
     def _get_centroid(bbox: List[float]) -> tuple:
@@ -0,0 +1,188 @@
+# core/quantization.py
+"""INT8 versions of exported ONNX detectors, built once and cached."""
+
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.detection_models import DetectionBatch
+from .geometry import iou_matrix
+from .video_utils import FrameSource
+
+logger = logging.getLogger(__name__)
+
+QUANT_MODES = ("dynamic", "static")
+
+
+def quantized_path(onnx_path: str, mode: str) -> str:
+    """Cache location of the INT8 model (``yolov8n.onnx`` -> ``yolov8n.int8-static.onnx``)."""
+    return os.path.splitext(onnx_path)[0] + f".int8-{mode}.onnx"
+
+
+def sample_frames(video_path: str, count: int) -> Iterable[np.ndarray]:
+    """``count`` frames spread evenly over ``video_path``, decoded lazily."""
+    source = FrameSource(video_path)
+    stride = max(source.frame_count // max(count, 1), 1)
+    source.skip_frames = stride - 1
+    for n, (_, _, frame) in enumerate(source):
+        if n == count:
+            break
+        yield frame
+
+
+def _head_nodes(model) -> List[str]:
+    """Non-convolution nodes of the detection head (the last ``/model.N/``).
+
+    They decode boxes (DFL softmax, anchor offsets, stride scaling) and
+    concatenate boxes with class scores, whose ranges differ by orders of
+    magnitude; a shared INT8 scale there costs most of the accuracy loss.
+    """
+    index = [re.match(r"/model\.(\d+)/", node.name) for node in model.graph.node]
+    last = max((int(m.group(1)) for m in index if m), default=None)
+    if last is None:
+        return []
+    prefix = f"/model.{last}/"
+    return [
+        node.name
+        for node in model.graph.node
+        if node.name.startswith(prefix) and node.op_type != "Conv"
+    ]
+
+
+def quantize_model(
+    onnx_path: str,
+    mode: str,
+    calibration: Optional[Callable[[], Iterable[np.ndarray]]] = None,
+) -> str:
+    """Path of the INT8 version of ``onnx_path``, quantizing it once.
+
+    ``"dynamic"`` stores INT8 weights and quantizes activations on the fly;
+    it needs no data but ONNX Runtime's integer convolutions are often no
+    faster than FP32 on CPU.  ``"static"`` also fixes the activation
+    ranges, calibrated on the input blobs yielded by ``calibration()``
+    (frames from the camera's own footage, letterboxed as at inference),
+    and runs as QDQ with per-channel weights.  The result is cached next to
+    ``onnx_path`` and rebuilt only when the FP32 model is newer.
+    """
+    if mode not in QUANT_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+    path = quantized_path(onnx_path, mode)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(onnx_path):
+        return path
+    if mode == "static" and calibration is None:
+        raise ValueError("Static quantization needs calibration frames (calibration_video)")
+
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    logger.info("Quantizing %s to INT8 (%s, one-time)", onnx_path, mode)
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = os.path.join(tmp, "prepared.onnx")
+        # YOLO graphs defeat symbolic shape inference; ONNX's own suffices
+        quant_pre_process(onnx_path, prepared, skip_symbolic_shape=True)
+        partial = f"{path}.{os.getpid()}.part"
+        if mode == "dynamic":
+            quantize_dynamic(prepared, partial, weight_type=QuantType.QUInt8)
+        else:
+            model = onnx.load(prepared)
+            input_name = model.graph.input[0].name
+
+            class Reader(CalibrationDataReader):
+                def __init__(self):
+                    self.blobs = iter(calibration())
+                    self.count = 0
+
+                def get_next(self):
+                    blob = next(self.blobs, None)
+                    if blob is None:
+                        return None
+                    self.count += 1
+                    return {input_name: blob}
+
+            reader = Reader()
+            quantize_static(
+                prepared,
+                partial,
+                reader,
+                quant_format=QuantFormat.QDQ,
+                per_channel=True,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                nodes_to_exclude=_head_nodes(model),
+            )
+            logger.info("Calibrated on %d frames", reader.count)
+        os.replace(partial, path)
+    return path
+
+
+def match_detections(
+    reference: DetectionBatch, candidate: DetectionBatch, iou: float = 0.5
+) -> np.ndarray:
+    """IoU of each matched pair, greedily by ``candidate`` confidence.
+
+    Boxes match only within the same frame and class.
+    """
+    ious: List[float] = []
+    for frame in np.unique(np.concatenate([reference.frame_idx, candidate.frame_idx])):
+        ref = reference.for_frame(frame)
+        cand = candidate.for_frame(frame)
+        if not len(ref) or not len(cand):
+            continue
+        overlap = iou_matrix(cand.xyxy, ref.xyxy)
+        overlap[cand.class_id[:, None] != ref.class_id[None, :]] = 0
+        taken = np.zeros(len(ref), bool)
+        for row in np.argsort(-cand.conf):
+            scores = np.where(taken, 0, overlap[row])
+            col = int(scores.argmax())
+            if scores[col] >= iou:
+                taken[col] = True
+                ious.append(float(scores[col]))
+    return np.array(ious, np.float32)
+
+
+def compare_detectors(
+    reference, candidate, frames: Sequence[np.ndarray], iou: float = 0.5
+) -> Dict[str, float]:
+    """Agreement of ``candidate`` with ``reference`` and their latencies.
+
+    Both are :class:`ObjectDetector` instances run one frame per call on
+    ``frames``; latency is the median per frame, after one warm-up call.
+    Recall is the share of reference boxes the candidate also finds,
+    precision the share of candidate boxes the reference also has.
+    """
+    results = []
+    for detector in (reference, candidate):
+        detector.detect(frames[:1])
+        batches, times = [], []
+        for i, frame in enumerate(frames):
+            t0 = time.perf_counter()
+            batches.append(detector.detect([frame], [i]))
+            times.append(time.perf_counter() - t0)
+        results.append((DetectionBatch.concat(batches, detector.names), times))
+    (ref, ref_times), (cand, cand_times) = results
+    matched = match_detections(ref, cand, iou)
+    ref_ms = float(np.median(ref_times) * 1e3)
+    cand_ms = float(np.median(cand_times) * 1e3)
+    return {
+        "frames": len(frames),
+        "reference_boxes": len(ref),
+        "candidate_boxes": len(cand),
+        "recall": len(matched) / len(ref) if len(ref) else 1.0,
+        "precision": len(matched) / len(cand) if len(cand) else 1.0,
+        "mean_iou": float(matched.mean()) if len(matched) else 0.0,
+        "reference_ms": ref_ms,
+        "candidate_ms": cand_ms,
+        "speedup": ref_ms / cand_ms if cand_ms else 0.0,
+    }
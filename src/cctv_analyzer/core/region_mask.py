@@ -0,0 +1,113 @@
+# core/region_mask.py
+"""Per-camera region of interest and exclusion zones."""
+
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from ..models.detection_models import DetectionBatch
+from .video_utils import FrameScale
+
+logger = logging.getLogger(__name__)
+
+
+class RegionMask:
+    """ROI / exclusion polygons rasterised once at the analysis resolution.
+
+    Polygons are given in source-frame pixels.  Analysis runs on the
+    bounding box of the allowed area only (:meth:`crop`), and pixels
+    outside it are zeroed before background subtraction (:meth:`masked`),
+    so swaying trees or a timestamp overlay never register as motion.
+    """
+
+    def __init__(
+        self,
+        scale: FrameScale,
+        roi: Sequence[Sequence[Sequence[float]]] = (),
+        exclude: Sequence[Sequence[Sequence[float]]] = (),
+    ):
+        w, h = scale.proxy_size
+        self.scale = scale
+
+        mask = np.zeros((h, w), np.uint8) if roi else np.full((h, w), 255, np.uint8)
+        for polygon in roi:
+            cv2.fillPoly(mask, [self._to_proxy(polygon)], 255)
+        for polygon in exclude:
+            cv2.fillPoly(mask, [self._to_proxy(polygon)], 0)
+
+        self.allowed_pixels = cv2.countNonZero(mask)
+        if not self.allowed_pixels:
+            raise ValueError("Camera regions exclude the whole frame")
+
+        x, y, bw, bh = cv2.boundingRect(mask)
+        self.box: Tuple[int, int, int, int] = (x, y, x + bw, y + bh)
+        self.mask = np.ascontiguousarray(mask[y : y + bh, x : x + bw])
+        # the crop is all allowed pixels: nothing to zero per frame
+        self.is_rectangular = self.allowed_pixels == bw * bh
+        self.is_full = self.is_rectangular and (bw, bh) == (w, h)
+        self._buffers: Dict[Tuple[int, ...], np.ndarray] = {}
+
+    @classmethod
+    def from_config(cls, camera_cfg, scale: FrameScale) -> Optional["RegionMask"]:
+        """Build the mask for a ``CameraConfig``, or ``None`` without regions."""
+        if not camera_cfg.roi and not camera_cfg.exclude:
+            return None
+        region = cls(scale, camera_cfg.roi, camera_cfg.exclude)
+        logger.info(
+            "Camera %s: analysing %.0f%% of the frame (crop %dx%d)",
+            camera_cfg.name,
+            100 * region.area_fraction,
+            region.mask.shape[1],
+            region.mask.shape[0],
+        )
+        return region
+
+    def _to_proxy(self, polygon: Sequence[Sequence[float]]) -> np.ndarray:
+        pts = np.asarray(polygon, dtype=np.float64) / (self.scale.sx, self.scale.sy)
+        return np.round(pts).astype(np.int32).reshape(-1, 1, 2)
+
+    @property
+    def area_fraction(self) -> float:
+        """Allowed pixels as a fraction of the whole analysis frame."""
+        w, h = self.scale.proxy_size
+        return self.allowed_pixels / (w * h)
+
+    @property
+    def score_factor(self) -> float:
+        """Turns a score over the crop into a fraction of the allowed area."""
+        return self.mask.size / self.allowed_pixels
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """View of the bounding box of the allowed area."""
+        x1, y1, x2, y2 = self.box
+        return frame[y1:y2, x1:x2]
+
+    def masked(self, frame: np.ndarray) -> np.ndarray:
+        """Cropped frame with pixels outside the allowed area set to zero.
+
+        Writes into a buffer reused across frames of the same shape.
+        """
+        crop = self.crop(frame)
+        if self.is_rectangular:
+            return crop
+        buf = self._buffers.get(crop.shape)
+        if buf is None:
+            buf = self._buffers[crop.shape] = np.empty(crop.shape, np.uint8)
+        buf.fill(0)
+        cv2.copyTo(crop, self.mask, buf)
+        return buf
+
+    def batch_to_frame(self, batch: DetectionBatch) -> DetectionBatch:
+        """Map detections on the crop to frame coordinates.
+
+        Detections whose box centre falls outside the allowed area are
+        dropped.
+        """
+        x0, y0 = self.box[:2]
+        h, w = self.mask.shape
+        centers = batch.centers.astype(np.int32)
+        cx = np.clip(centers[:, 0], 0, w - 1)
+        cy = np.clip(centers[:, 1], 0, h - 1)
+        return batch.select(self.mask[cy, cx] > 0).transformed(dx=x0, dy=y0)
@@ -2,13 +2,17 @@
 """Video export module for creating highlight clips."""
 
 import logging
+import subprocess
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import cv2
 import numpy as np
 
 from ..models.event_models import Event, VideoSegment
+from .decoders import open_decoder
+from .frame_cache import FrameCache
+from .keyframe_index import KeyframeIndex, load_or_build_index
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +20,17 @@ logger = logging.getLogger(__name__)
 class VideoExporter:
     """Handles creation and export of highlight video clips."""
 
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        frame_cache: Optional[FrameCache] = None,
+        decoder: str = "opencv",
+        index: Optional[KeyframeIndex] = None,
+    ):
         self.config = config
+        self.frame_cache = frame_cache
+        self.decoder = decoder
+        self.index = index
 
     def create_highlights(
         self,
@@ -25,17 +38,28 @@ class VideoExporter:
         events: List[Event],
         timestamps: List[float],
         output_dir: str,
+        fps: Optional[float] = None,
     ) -> List[VideoSegment]:
+        """Export clips around ``events``; segment frames are source frame numbers.
+
+        ``fps`` of the source video is read from the file when not given.
+        """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
+        if fps is None:
+            cap = cv2.VideoCapture(video_path)
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            cap.release()
 
-        segments = self._create_segments(events, timestamps)
+        segments = self._create_segments(events, timestamps, fps)
         segments = self._merge_segments(segments)
 
+        if self.config.stream_copy:
+            return self._copy_segments(video_path, segments, output_dir)
         return self._export_segments(video_path, segments, output_dir)
 
     def _create_segments(
-        self, events: List[Event], timestamps: List[float]
+        self, events: List[Event], timestamps: List[float], fps: float
     ) -> List[VideoSegment]:
         buffer = self.config.buffer_seconds
         segs = []
@@ -47,17 +71,18 @@ class VideoExporter:
                 VideoSegment(
                     start_time=start_time,
                     end_time=end_time,
-                    start_frame=self._find_frame_index(timestamps, start_time),
-                    end_frame=self._find_frame_index(timestamps, end_time),
+                    start_frame=self._source_frame(start_time, fps),
+                    end_frame=self._source_frame(end_time, fps),
                     duration=end_time - start_time,
                     events=[e],
                 )
             )
         return segs
 
-    @staticmethod
-    def _find_frame_index(timestamps: List[float], target: float) -> int:
-        return min(range(len(timestamps)), key=lambda i: abs(timestamps[i] - target))
+    def _source_frame(self, seconds: float, fps: float) -> int:
+        if self.index is not None:
+            return self.index.frame_at(seconds)
+        return int(seconds * fps)
 
     def _merge_segments(self, segments: List[VideoSegment]) -> List[VideoSegment]:
         if not segments:
@@ -76,41 +101,52 @@ class VideoExporter:
         return merged
 
     def _export_segments(
-        self, video_path: str, segments: List[VideoSegment], output_dir: Path
+        self,
+        video_path: str,
+        segments: List[VideoSegment],
+        output_dir: Path,
+        first_number: int = 1,
     ) -> List[VideoSegment]:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Cannot open video: {video_path}")
+        cap = open_decoder(video_path, self.decoder, index=self.index)
+
+        fps = cap.fps
+        frame_width, frame_height = cap.width, cap.height
+        total_frames = cap.frame_count
 
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # frames decoded during analysis are read back via mmap, no re-decode
+        cached = (
+            self.frame_cache.open(video_path, (frame_width, frame_height))
+            if self.frame_cache is not None
+            else None
+        )
+        if cached is not None:
+            cap.release()
+            total_frames = len(cached)
 
         exported = []
 
         fourcc = cv2.VideoWriter_fourcc(*self.config.video_codec)
 
-        for i, seg in enumerate(segments):
-            primary_event = max(seg.events, key=lambda e: e.score)
-            filename = (
-                f"highlight_{i+1:03d}_{primary_event.type}_{primary_event.score:.2f}."
-                f"{self.config.output_format}"
-            )
-            output_file = output_dir / filename
+        for i, seg in enumerate(segments, start=first_number):
+            output_file = output_dir / self._segment_filename(i, seg)
             writer = cv2.VideoWriter(
                 str(output_file), fourcc, fps, (frame_width, frame_height)
             )
 
-            start_frame = int(seg.start_time * fps)
-            end_frame = int(seg.end_time * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-            for frame_num in range(start_frame, min(end_frame, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))):
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            if cached is None:
+                cap.seek(seg.start_frame)
+
+            for frame_num in range(seg.start_frame, min(seg.end_frame, total_frames)):
+                if cached is not None:
+                    frame = cached[frame_num]
+                    if self.config.add_annotations:
+                        frame = frame.copy()  # cache pages are read-only
+                else:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
                 if self.config.add_annotations:
-                    frame = self._add_annotations(frame, seg, frame_num - start_frame, fps)
+                    frame = self._add_annotations(frame, seg, frame_num - seg.start_frame, fps)
                 writer.write(frame)
             writer.release()
 
@@ -120,6 +156,54 @@ class VideoExporter:
         cap.release()
         return exported
 
+    def _segment_filename(self, number: int, seg: VideoSegment) -> str:
+        primary_event = max(seg.events, key=lambda e: e.score)
+        return (
+            f"highlight_{number:03d}_{primary_event.type}_{primary_event.score:.2f}."
+            f"{self.config.output_format}"
+        )
+
+    def _copy_segments(
+        self, video_path: str, segments: List[VideoSegment], output_dir: Path
+    ) -> List[VideoSegment]:
+        """Cut clips without re-encoding, starting at the preceding keyframe.
+
+        Annotations cannot be drawn on stream-copied video.
+        """
+        import imageio_ffmpeg
+
+        index = self.index or load_or_build_index(video_path)
+        exported = []
+        for i, seg in enumerate(segments, start=1):
+            output_file = output_dir / self._segment_filename(i, seg)
+            key = index.keyframe_before(index.frame_at(seg.start_time))
+            start = index.frame_time(key)
+            cmd = [
+                imageio_ffmpeg.get_ffmpeg_exe(), "-v", "error", "-nostdin", "-y",
+                "-ss", f"{start:.6f}", "-i", video_path,
+                "-t", f"{seg.end_time - start:.6f}",
+                "-map", "0:v:0", "-c", "copy", "-avoid_negative_ts", "make_zero",
+                str(output_file),
+            ]
+            try:
+                subprocess.run(cmd, check=True, stderr=subprocess.PIPE)
+            except subprocess.CalledProcessError as exc:
+                logger.warning(
+                    "Stream copy failed for %s, re-encoding instead: %s",
+                    output_file.name, exc.stderr.decode(errors="replace").strip(),
+                )
+                exported.extend(
+                    self._export_segments(video_path, [seg], output_dir, first_number=i)
+                )
+                continue
+
+            seg.start_time = start
+            seg.start_frame = key
+            seg.duration = seg.end_time - start
+            seg.output_file = output_file
+            exported.append(seg)
+        return exported
+
     def _add_annotations(
         self, frame: np.ndarray, segment: VideoSegment, rel_frame: int, fps: float
     ) -> np.ndarray:
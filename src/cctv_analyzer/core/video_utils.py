@@ -1,33 +1,352 @@
 """Tiny helpers for frame extraction and timestamp generation."""
 
-from typing import List, Tuple
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import cv2
 import numpy as np
 
+from ..models.detection_models import DetectionBatch
+from .decoders import VideoDecoder, open_decoder
+from .frame_cache import CachedVideo, FrameCache, FrameCacheWriter
+from .keyframe_index import KeyframeIndex
+
+
+class FrameSource:
+    """Lazily decoded video, iterated as ``(frame_idx, timestamp, frame)``.
+
+    Only one frame is held in memory at a time, so peak memory does not
+    depend on the length of the video.  Every iteration opens a fresh
+    decoder, which makes the source re-iterable.
+
+    Frames that are not sampled are only ``grab()``-ed (demuxed and
+    decoded, but never converted to BGR).  ``sample_fps`` samples by time
+    instead of by ``skip_frames``; with ``seek=True`` the source jumps
+    straight to each sampled frame, which pays off once the sampling
+    stride is longer than the keyframe interval.
+
+    ``decoder`` picks the backend (see :mod:`.decoders`); ``size`` and
+    ``gray`` request frames already scaled / converted by the decoder.
+    ``width``/``height`` always describe the source video.  A keyframe
+    ``index`` makes seek sampling frame-accurate and bounded.
+
+    With a ``frame_cache`` every decoded frame is also written to the
+    on-disk cache, and later iterations read from it instead of decoding.
+
+    ``start_frame`` / ``end_frame`` restrict iteration to a half-open range
+    of source frames.  Sampling stays aligned to absolute frame indices, so
+    a range yields exactly the frames a full pass would yield inside it.
+    Only a full pass (no ``start_frame``, no ``end_frame``) writes the
+    cache; ranges read a committed entry but never start one.
+
+    ``skip_frames`` and ``sample_fps`` may be changed while iterating;
+    sampling continues at the next multiple of the new stride.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        *,
+        skip_frames: int = 0,
+        sample_fps: Optional[float] = None,
+        seek: bool = False,
+        frame_cache: Optional[FrameCache] = None,
+        decoder: str = "opencv",
+        size: Optional[Sequence[int]] = None,
+        gray: bool = False,
+        threads: int = 0,
+        index: Optional[KeyframeIndex] = None,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+    ):
+        self.video_path = video_path
+        self.skip_frames = skip_frames
+        self.sample_fps = sample_fps
+        self.seek = seek
+        self.frame_cache = frame_cache
+        self.decoder = decoder
+        self.gray = gray
+        self.threads = threads
+        self.index = index
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video: {video_path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+        self.size: Tuple[int, int] = tuple(size) if size else (self.width, self.height)
+
+    @property
+    def stop(self) -> int:
+        """One past the last source frame to visit."""
+        return self.frame_count if self.end_frame is None else self.end_frame
+
+    @property
+    def stride(self) -> int:
+        """Source frames per sampled frame."""
+        if self.sample_fps:
+            return max(1, int(round(self.fps / self.sample_fps)))
+        return self.skip_frames + 1
+
+    def open_decoder(self) -> VideoDecoder:
+        return open_decoder(
+            self.video_path,
+            self.decoder,
+            size=self.size,
+            gray=self.gray,
+            threads=self.threads,
+            index=self.index,
+        )
+
+    def __iter__(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        cache_writer = None
+        if self.frame_cache is not None and not self.gray:
+            cached = self.frame_cache.open(self.video_path, self.size)
+            if cached is not None:
+                yield from self._iter_cached(cached)
+                return
+            if not self.seek and not self.start_frame and self.end_frame is None:
+                cache_writer = self.frame_cache.writer(
+                    self.video_path, self.size, self.frame_count, self.fps
+                )
+
+        decoder = self.open_decoder()
+        try:
+            if self.seek and self.stride > 1:
+                yield from self._iter_seek(decoder)
+            else:
+                yield from self._iter_grab(decoder, cache_writer)
+                if cache_writer is not None:
+                    cache_writer.commit()
+                    cache_writer = None
+        finally:
+            if cache_writer is not None:
+                cache_writer.abort()
+            decoder.release()
+
+    def _first_sample(self) -> int:
+        return -(-self.start_frame // self.stride) * self.stride
+
+    def _next_sample(self, idx: int) -> int:
+        # the stride is re-read every frame, so it may change mid-iteration
+        return (idx // self.stride + 1) * self.stride
+
+    def _iter_cached(self, cached: CachedVideo) -> Iterator[Tuple[int, float, np.ndarray]]:
+        stop = min(len(cached), self.stop) if self.end_frame is not None else len(cached)
+        idx = self._first_sample()
+        while idx < stop:
+            yield idx, idx / self.fps, cached[idx]
+            idx = self._next_sample(idx)
+
+    def _iter_grab(
+        self, decoder: VideoDecoder, cache_writer: Optional[FrameCacheWriter] = None
+    ) -> Iterator[Tuple[int, float, np.ndarray]]:
+        idx = self.start_frame
+        if idx:
+            decoder.seek(idx)
+        while (self.end_frame is None or idx < self.end_frame) and decoder.grab():
+            sampled = idx % self.stride == 0
+            if cache_writer is not None or sampled:
+                ret, frame = decoder.retrieve()
+                if not ret:
+                    break
+                if cache_writer is not None:
+                    cache_writer.write(idx, frame)
+                if sampled:
+                    yield idx, idx / self.fps, frame
+            idx += 1
+
+    def _iter_seek(self, decoder: VideoDecoder) -> Iterator[Tuple[int, float, np.ndarray]]:
+        idx = self._first_sample()
+        while idx < self.stop:
+            decoder.seek(idx)
+            ret, frame = decoder.read()
+            if not ret:
+                break
+            yield idx, idx / self.fps, frame
+            idx = self._next_sample(idx)
+
+
+class PrefetchReader:
+    """Decodes frames on a background thread into a bounded queue.
+
+    OpenCV releases the GIL while decoding, so decode overlaps with the
+    analysis running on the consuming thread.  ``depth`` bounds how many
+    decoded frames may be waiting; ``depth=0`` decodes inline instead.
+    Counters are available from :attr:`stats` during and after iteration.
+    """
+
+    _END = object()
+
+    def __init__(self, frames: Iterable[Any], depth: int = 8):
+        self.frames = frames
+        self.depth = depth
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.frames_decoded = 0
+        self.decode_seconds = 0.0
+        self.starved = 0              # consumer found the queue empty
+        self.starved_seconds = 0.0
+        self.producer_blocked = 0     # decoder found the queue full
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "prefetch_depth": self.depth,
+            "frames_decoded": self.frames_decoded,
+            "decode_seconds": round(self.decode_seconds, 3),
+            "decode_fps": round(self.frames_decoded / self.decode_seconds, 1)
+            if self.decode_seconds
+            else 0.0,
+            "queue_starved": self.starved,
+            "queue_starved_seconds": round(self.starved_seconds, 3),
+            "producer_blocked": self.producer_blocked,
+        }
+
+    def _timed(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.decode_seconds += time.perf_counter() - t0
+            self.frames_decoded += 1
+            yield item
+
+    def __iter__(self) -> Iterator[Any]:
+        self._reset_counters()
+        if self.depth <= 0:
+            yield from self._timed(iter(self.frames))
+            return
+
+        buf: "queue.Queue" = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            try:
+                buf.put_nowait(item)
+                return True
+            except queue.Full:
+                self.producer_blocked += 1
+            while not stop.is_set():
+                try:
+                    buf.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for item in self._timed(iter(self.frames)):
+                    if not put(item):
+                        return
+                put((self._END, None))
+            except BaseException as exc:  # re-raised on the consumer side
+                put((self._END, exc))
+
+        worker = threading.Thread(target=produce, name="frame-decoder", daemon=True)
+        worker.start()
+        try:
+            while True:
+                try:
+                    item = buf.get_nowait()
+                except queue.Empty:
+                    self.starved += 1
+                    t0 = time.perf_counter()
+                    item = buf.get()
+                    self.starved_seconds += time.perf_counter() - t0
+                if isinstance(item, tuple) and item and item[0] is self._END:
+                    if item[1] is not None:
+                        raise item[1]
+                    return
+                yield item
+        finally:
+            stop.set()
+            worker.join()
+
 
 def extract_frames(
     video_path: str,
     *,
     skip_frames: int = 0,
 ) -> Tuple[List[np.ndarray], List[float], float]:
-    """Return list(frames), list(timestamps), fps."""
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Cannot open video: {video_path}")
+    """Return list(frames), list(timestamps), fps.
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
+    Holds every sampled frame in memory; prefer :class:`FrameSource` for
+    anything longer than a short clip.
+    """
+    source = FrameSource(video_path, skip_frames=skip_frames)
     frames: List[np.ndarray] = []
     timestamps: List[float] = []
-    idx = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if skip_frames and (idx % (skip_frames + 1)):
-            idx += 1
-            continue
+    for _, ts, frame in source:
         frames.append(frame)
-        timestamps.append(idx / fps)
-        idx += 1
-    cap.release()
-    return frames, timestamps, fps
+        timestamps.append(ts)
+    return frames, timestamps, source.fps
+
+
+@dataclass(frozen=True)
+class FrameScale:
+    """Maps analysis-proxy coordinates back to source-frame pixels."""
+
+    proxy_size: Tuple[int, int]           # (w, h) of the analysis frames
+    sx: float = 1.0                       # source px per proxy px
+    sy: float = 1.0
+
+    @classmethod
+    def fit(
+        cls,
+        source_size: Tuple[int, int],
+        target_size: Optional[Sequence[int]],
+    ) -> "FrameScale":
+        """Shrink ``source_size`` to fit ``target_size``, keeping aspect ratio.
+
+        Frames are never upscaled; ``None`` keeps the source resolution.
+        """
+        src_w, src_h = source_size
+        if not target_size or not src_w or not src_h:
+            return cls((src_w, src_h))
+        ratio = min(target_size[0] / src_w, target_size[1] / src_h, 1.0)
+        proxy_w = max(1, int(round(src_w * ratio)))
+        proxy_h = max(1, int(round(src_h * ratio)))
+        return cls((proxy_w, proxy_h), src_w / proxy_w, src_h / proxy_h)
+
+    @property
+    def is_identity(self) -> bool:
+        return self.sx == 1.0 and self.sy == 1.0
+
+    @property
+    def area_factor(self) -> float:
+        """Source px² per proxy px²."""
+        return self.sx * self.sy
+
+    def batch_to_source(self, batch: DetectionBatch) -> DetectionBatch:
+        return batch if self.is_identity else batch.transformed(self.sx, self.sy)
+
+
+def make_proxy(frame: np.ndarray, scale: FrameScale) -> np.ndarray:
+    """Downscale a decoded frame to the analysis resolution.
+
+    Frames the decoder already delivered at that size pass through as-is.
+    """
+    if (frame.shape[1], frame.shape[0]) == scale.proxy_size:
+        return frame
+    return cv2.resize(frame, scale.proxy_size, interpolation=cv2.INTER_AREA)
+
+
+def to_gray(frame: np.ndarray) -> np.ndarray:
+    """Single-channel view of a frame for motion analysis."""
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
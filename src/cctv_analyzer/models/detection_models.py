@@ -0,0 +1,129 @@
+"""Columnar container for object detections."""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class DetectionBatch:
+    """Detections of one or more frames as parallel NumPy columns.
+
+    Row ``i`` is one box: ``xyxy[i]`` (x1, y1, x2, y2), ``conf[i]``,
+    ``class_id[i]`` and the ``frame_idx[i]`` it was found in.  ``names``
+    maps class IDs to class names and is shared, not copied, between
+    batches derived from one another.
+    """
+
+    xyxy: np.ndarray          # (N, 4) float32
+    conf: np.ndarray          # (N,) float32
+    class_id: np.ndarray      # (N,) int32
+    frame_idx: np.ndarray     # (N,) int64
+    names: Mapping[int, str]
+
+    @classmethod
+    def empty(cls, names: Mapping[int, str]) -> "DetectionBatch":
+        return cls(
+            np.zeros((0, 4), np.float32),
+            np.zeros(0, np.float32),
+            np.zeros(0, np.int32),
+            np.zeros(0, np.int64),
+            names,
+        )
+
+    @classmethod
+    def from_array(
+        cls, data: np.ndarray, frame_idx: int, names: Mapping[int, str]
+    ) -> "DetectionBatch":
+        """Build from an (N, 6) ``x1, y1, x2, y2, conf, class`` array."""
+        return cls(
+            np.ascontiguousarray(data[:, :4], dtype=np.float32),
+            data[:, 4].astype(np.float32),
+            data[:, 5].astype(np.int32),
+            np.full(len(data), frame_idx, np.int64),
+            names,
+        )
+
+    @classmethod
+    def from_dicts(
+        cls, detections: Sequence[Dict], frame_idx: int = 0
+    ) -> "DetectionBatch":
+        """Convert the per-detection dict format."""
+        names = {d["class_id"]: d["class"] for d in detections}
+        if not detections:
+            return cls.empty(names)
+        return cls(
+            np.array([d["bbox"] for d in detections], np.float32).reshape(-1, 4),
+            np.array([d["confidence"] for d in detections], np.float32),
+            np.array([d["class_id"] for d in detections], np.int32),
+            np.full(len(detections), frame_idx, np.int64),
+            names,
+        )
+
+    @classmethod
+    def concat(
+        cls, batches: Sequence["DetectionBatch"], names: Optional[Mapping[int, str]] = None
+    ) -> "DetectionBatch":
+        if not batches:
+            return cls.empty(names or {})
+        return cls(
+            np.concatenate([b.xyxy for b in batches]),
+            np.concatenate([b.conf for b in batches]),
+            np.concatenate([b.class_id for b in batches]),
+            np.concatenate([b.frame_idx for b in batches]),
+            names if names is not None else batches[0].names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    @property
+    def area(self) -> np.ndarray:
+        return (self.xyxy[:, 2] - self.xyxy[:, 0]) * (self.xyxy[:, 3] - self.xyxy[:, 1])
+
+    @property
+    def centers(self) -> np.ndarray:
+        """(N, 2) box centres."""
+        return (self.xyxy[:, :2] + self.xyxy[:, 2:]) / 2
+
+    def select(self, rows) -> "DetectionBatch":
+        """Rows picked by a boolean mask or an index array."""
+        return DetectionBatch(
+            self.xyxy[rows],
+            self.conf[rows],
+            self.class_id[rows],
+            self.frame_idx[rows],
+            self.names,
+        )
+
+    def with_classes(self, class_ids: np.ndarray) -> "DetectionBatch":
+        """Only detections whose class ID is in ``class_ids``."""
+        return self.select(np.isin(self.class_id, class_ids))
+
+    def for_frame(self, frame_idx: int) -> "DetectionBatch":
+        return self.select(self.frame_idx == frame_idx)
+
+    def transformed(
+        self, sx: float = 1.0, sy: float = 1.0, dx: float = 0.0, dy: float = 0.0
+    ) -> "DetectionBatch":
+        """Boxes scaled by (sx, sy) after being shifted by (dx, dy)."""
+        xyxy = (self.xyxy + np.array([dx, dy, dx, dy], np.float32)) * np.array(
+            [sx, sy, sx, sy], np.float32
+        )
+        return DetectionBatch(xyxy, self.conf, self.class_id, self.frame_idx, self.names)
+
+    def to_dicts(self) -> List[Dict]:
+        """The per-detection dict format used by the tracker and exports."""
+        return [
+            {
+                "bbox": [float(x1), float(y1), float(x2), float(y2)],
+                "confidence": float(conf),
+                "class": self.names[int(cid)],
+                "class_id": int(cid),
+                "area": float((x2 - x1) * (y2 - y1)),
+            }
+            for (x1, y1, x2, y2), conf, cid in zip(
+                self.xyxy.tolist(), self.conf.tolist(), self.class_id.tolist()
+            )
+        ]
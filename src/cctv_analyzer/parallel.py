@@ -0,0 +1,315 @@
+# src/cctv_analyzer/parallel.py
+"""Chunk-parallel analysis of one long video across worker processes."""
+
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .core.frame_cache import FrameCache
+from .core.geometry import pair_iou
+from .core.keyframe_index import KeyframeIndex
+from .pipeline import analyse_range
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Source-frame range analysed by one worker."""
+
+    warm_start: int     # keyframe decoding starts at (warm-up only)
+    start: int          # first frame whose results are kept
+    end: int            # one past the last frame
+
+
+def plan_chunks(
+    index: KeyframeIndex, n_chunks: int, overlap_seconds: float
+) -> List[Chunk]:
+    """Split the video into ``n_chunks`` time ranges cut at keyframes.
+
+    Each chunk after the first starts decoding at the keyframe preceding
+    ``overlap_seconds`` before its start, to warm up the background model
+    and the tracker.
+    """
+    n_frames = len(index)
+    bounds = [0]
+    for k in range(1, n_chunks):
+        cut = index.keyframe_before(round(k * n_frames / n_chunks))
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    bounds.append(n_frames)
+
+    return [
+        Chunk(
+            warm_start=index.keyframe_before(
+                index.frame_at(max(0.0, index.frame_time(start) - overlap_seconds))
+            ),
+            start=start,
+            end=end,
+        )
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def _init_worker(threads: int, uses_torch: bool) -> None:
+    # keep N workers from each spawning one thread per core
+    cv2.setNumThreads(threads)
+    if not uses_torch:
+        return  # importing torch alone costs seconds and hundreds of MB
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _analyse_chunk(
+    video_path: str, chunk: Chunk, kwargs: Dict[str, Any], handover_from: Optional[int] = None
+) -> Dict[str, Any]:
+    return analyse_range(
+        video_path,
+        start_frame=chunk.warm_start,
+        end_frame=chunk.end,
+        report_from=chunk.start,
+        handover_from=handover_from,
+        **kwargs,
+    )
+
+
+def analyse_parallel(
+    video_path: str,
+    *,
+    index: KeyframeIndex,
+    frame_cache: Optional[FrameCache] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Run :func:`analyse_range` on keyframe-aligned chunks in parallel.
+
+    Takes the same configuration keywords as :func:`analyse_range` and
+    returns the same structure, stitched back into one timeline.  Tracks
+    seen in the warm-up of the next chunk are handed over whole for
+    stitching; with an ``event_cfg`` the others are analysed in their
+    worker, and their events get track IDs after the stitched ones.
+    """
+    video_cfg = kwargs["video_cfg"]
+    workers = video_cfg.workers
+    # a primed background needs no warm-up; keep enough to hand tracks over
+    overlap = (
+        video_cfg.primed_overlap_seconds
+        if kwargs.get("background") is not None
+        else video_cfg.chunk_overlap_seconds
+    )
+    chunks = plan_chunks(index, workers, overlap)
+    # a track reaching into the next chunk's warm-up may be relinked there
+    handovers = [c.warm_start for c in chunks[1:]] + [None]
+    logger.info(
+        "Analysing %s in %d chunks on %d workers", video_path, len(chunks), workers
+    )
+
+    t0 = time.perf_counter()
+    # chunks only read a cache filled by an earlier full pass: a range with
+    # an end frame never writes one (see FrameSource)
+    kwargs = dict(kwargs, frame_cache=frame_cache, index=index)
+    if len(chunks) == 1:
+        parts = [_analyse_chunk(video_path, chunks[0], kwargs)]
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        objdet_cfg = kwargs["objdet_cfg"]
+        uses_torch = objdet_cfg.backend == "ultralytics" and not objdet_cfg.motion_only
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads, uses_torch),
+        ) as pool:
+            parts = list(
+                pool.map(
+                    _analyse_chunk,
+                    [video_path] * len(chunks),
+                    chunks,
+                    [kwargs] * len(chunks),
+                    handovers,
+                )
+            )
+    wall = time.perf_counter() - t0
+
+    iou_threshold = kwargs["tracker_cfg"].iou_threshold
+    tracks, relinked = stitch_tracks(
+        [
+            (c.warm_start / p["fps"], c.start / p["fps"], p["tracked_history"])
+            for c, p in zip(chunks, parts)
+        ],
+        iou_threshold,
+    )
+    result = {
+        "fps": parts[0]["fps"],
+        "timestamps": [ts for p in parts for ts in p["timestamps"]],
+        "motion_scores": [s for p in parts for s in p["motion_scores"]],
+        "tracked_history": tracks,
+        "track_events": _renumber_track_events([p["track_events"] for p in parts], len(tracks)),
+        "class_counts": _merge_class_counts([p["class_counts"] for p in parts]),
+        "decode": _merge_decode_stats([p["decode"] for p in parts]),
+        "detection": _merge_gate_stats([p["detection"] for p in parts]),
+        "analysed_area_fraction": parts[0]["analysed_area_fraction"],
+        "motion_primed": all(p["motion_primed"] for p in parts),
+        "stage_seconds": _merge_stage_seconds([p["stage_seconds"] for p in parts]),
+        "background": parts[-1]["background"],
+        "autotune": _merge_autotune([p["autotune"] for p in parts]),
+    }
+    result["parallel"] = {
+        "workers": workers,
+        "chunks": [[c.warm_start, c.start, c.end] for c in chunks],
+        "warmup_frames": sum(c.start - c.warm_start for c in chunks),
+        "tracks_relinked": relinked,
+        "analysis_wall_seconds": round(wall, 3),
+    }
+    return result
+
+
+# ─────────────────── stitching ────────────────────────────
+def stitch_tracks(
+    parts: Sequence[Tuple[float, float, Dict[int, List[Dict]]]],
+    iou_threshold: float,
+) -> Tuple[Dict[int, List[Dict]], int]:
+    """Merge per-chunk track histories into one, with global track IDs.
+
+    ``parts`` holds ``(warm-up start, chunk start, history)`` times and
+    histories in chunk order.  Entries before the chunk start come from
+    the warm-up overlap; a track there is re-associated with the already
+    stitched track whose boxes at the same timestamps overlap it best
+    (mean IoU above ``iou_threshold``, one-to-one), and only entries from
+    the chunk start on are appended.  Returns the stitched history and the number of
+    tracks carried across a chunk boundary.
+    """
+    stitched: Dict[int, List[Dict]] = {}
+    next_id = 0
+    relinked = 0
+
+    for warm_ts, start_ts, history in parts:
+        # boxes of already stitched tracks inside this chunk's overlap
+        previous = {}
+        for gid, hist in stitched.items():
+            boxes = {
+                e["timestamp"]: e["bbox"]
+                for e in hist
+                if warm_ts <= e["timestamp"] < start_ts
+            }
+            if boxes:
+                previous[gid] = boxes
+
+        candidates = []
+        for local_id, hist in history.items():
+            overlap = [e for e in hist if e["timestamp"] < start_ts]
+            for gid, boxes in previous.items():
+                pairs = [
+                    (e["bbox"], boxes[e["timestamp"]])
+                    for e in overlap
+                    if e["timestamp"] in boxes
+                ]
+                if not pairs:
+                    continue
+                pairs = np.array(pairs, np.float64)
+                mean_iou = float(pair_iou(pairs[:, 0], pairs[:, 1]).mean())
+                if mean_iou > iou_threshold:
+                    candidates.append((mean_iou, local_id, gid))
+
+        mapping: Dict[int, int] = {}
+        taken = set()
+        for _, local_id, gid in sorted(candidates, reverse=True):
+            if local_id in mapping or gid in taken:
+                continue
+            mapping[local_id] = gid
+            taken.add(gid)
+        relinked += len(mapping)
+
+        for local_id, hist in sorted(history.items()):
+            kept = [e for e in hist if e["timestamp"] >= start_ts]
+            if not kept:
+                continue            # only seen during warm-up: already stitched
+            gid = mapping.get(local_id)
+            if gid is None:
+                gid = next_id
+                next_id += 1
+                stitched[gid] = []
+            for entry in kept:
+                stitched[gid].append(dict(entry, id=gid))
+
+    return stitched, relinked
+
+
+def _renumber_track_events(parts: List[List[Any]], first_id: int) -> List[Any]:
+    """Events of tracks analysed in the workers, with IDs unique across chunks."""
+    events = []
+    next_id = first_id
+    for part in parts:
+        ids: Dict[int, int] = {}
+        for event in part:
+            if event.object_id not in ids:
+                ids[event.object_id] = next_id
+                next_id += 1
+            event.object_id = ids[event.object_id]
+            events.append(event)
+    return events
+
+
+def _merge_decode_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = dict(stats[0])
+    for key in ("frames_decoded", "queue_starved", "producer_blocked"):
+        merged[key] = sum(s[key] for s in stats)
+    for key in ("decode_seconds", "queue_starved_seconds"):
+        merged[key] = round(sum(s[key] for s in stats), 3)
+    merged["decode_fps"] = (
+        round(merged["frames_decoded"] / merged["decode_seconds"], 1)
+        if merged["decode_seconds"]
+        else 0.0
+    )
+    return merged
+
+
+def _merge_gate_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    frames = sum(s["frames"] for s in stats)
+    calls = sum(s["detector_calls"] for s in stats)
+    return {
+        "frames": frames,
+        "detector_calls": calls,
+        "dedup_calls_saved": sum(s["dedup_calls_saved"] for s in stats),
+        "propagated_frames": sum(s["propagated_frames"] for s in stats),
+        "redetections": sum(s["redetections"] for s in stats),
+        "crop_frames": sum(s["crop_frames"] for s in stats),
+        "crops": sum(s["crops"] for s in stats),
+        "skipped_fraction": round((frames - calls) / frames, 4) if frames else 0.0,
+        "detector_speedup": round(frames / calls, 2) if calls else None,
+    }
+
+
+def _merge_autotune(reports: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    if reports[0] is None:
+        return None
+    # settings in force at the end of the video, every chunk's adjustments
+    adjustments = sorted(
+        (a for r in reports for a in r["adjustments"]), key=lambda a: a["at_seconds"]
+    )
+    return {**reports[-1], "adjustments": adjustments}
+
+
+def _merge_class_counts(counts: List[Dict[str, int]]) -> Dict[str, int]:
+    total: Counter = Counter()
+    for c in counts:
+        total.update(c)
+    return dict(total)
+
+
+def _merge_stage_seconds(reports: List[Dict[str, float]]) -> Dict[str, float]:
+    total: Dict[str, float] = Counter()
+    for report in reports:
+        total.update(report)
+    return {stage: round(sec, 3) for stage, sec in total.items()}
@@ -1,82 +1,531 @@
 # src/cctv_analyzer/pipeline.py
 """Single entry‑point that wires all components together."""
 
+import dataclasses
 import json
+import logging
 import pathlib
-from collections import defaultdict
-from typing import Dict, Any, List
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Union
 
-from .core.motion_detector import MotionDetector
+import numpy as np
+
+from .core.motion_detector import MOTION_NAMES, MotionDetector
 from .core.object_detector import ObjectDetector
 from .core.object_tracker import ObjectTracker
 from .core.event_analyzer import EventAnalyzer
 from .core.video_exporter import VideoExporter
+from .core.frame_cache import FrameCache
+from .core.keyframe_index import load_or_build_index
+from .core.detection_gate import DetectionGate
+from .core.region_mask import RegionMask
+from .core.motion_crops import MotionCrops
+from .core.box_propagator import BoxPropagator
+from .core.background_model import BackgroundModel, background_path
 from .core import video_utils
+from .models.detection_models import DetectionBatch
 from .config import (
+    VideoConfig,
+    CameraConfig,
     MotionDetectorConfig,
     ObjectDetectorConfig,
     ObjectTrackerConfig,
     EventAnalyzerConfig,
     VideoExporterConfig,
+    load_config,
 )
 from .models.event_models import Event, VideoSegment
 
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """Accumulates wall-clock seconds per pipeline stage."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - t0
+
+    @property
+    def report(self) -> Dict[str, float]:
+        return {stage: round(sec, 3) for stage, sec in self.seconds.items()}
+
+
+class QueuedFrame(NamedTuple):
+    """A sampled frame waiting for the next detection batch."""
+
+    idx: int
+    ts: float
+    motion_score: float
+    detect: Union[None, np.ndarray, MotionCrops] = None  # detector input, None if skipped
+    reuse: bool = False                                 # duplicate: reuse last detections
+    image: Optional[np.ndarray] = None                  # detection frame (propagation)
+    gray: Optional[np.ndarray] = None                   # its grey version (propagation)
+    blobs: Optional[DetectionBatch] = None              # motion blobs as detections (motion-only)
+
+
+def analyse_range(
+    video_path: str,
+    *,
+    video_cfg: VideoConfig,
+    camera_cfg: CameraConfig,
+    motion_cfg: MotionDetectorConfig,
+    objdet_cfg: ObjectDetectorConfig,
+    tracker_cfg: ObjectTrackerConfig,
+    skip_frames: int,
+    frame_cache: Optional[FrameCache] = None,
+    index=None,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    report_from: Optional[int] = None,
+    background: Optional[BackgroundModel] = None,
+    detector: Optional[ObjectDetector] = None,
+    governor=None,
+    event_cfg: Optional[EventAnalyzerConfig] = None,
+    handover_from: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Motion, detection and tracking over source frames ``[start, end)``.
+
+    Frames before ``report_from`` only warm up the background model and the
+    tracker: their motion scores and detections are not returned, but track
+    entries are (the parallel runner matches tracks across chunks on them).
+    A saved ``background`` primes motion detection if its geometry matches.
+    With ``objdet_cfg.motion_only`` no detector is loaded: the motion
+    blobs of every frame are tracked as class-agnostic detections.
+    A loaded ``detector`` may be passed in to be reused.  A ``governor``
+    (see :mod:`.autotune`) may change the sampling stride, input size and
+    batch size while the range is analysed.
+
+    With an ``event_cfg``, each track is analysed for events as soon as
+    it finishes and only its events are kept (``track_events``), so
+    memory does not grow with the number of finished tracks.  Histories
+    are still returned whole for tracks the parallel runner may stitch:
+    those with entries before ``report_from`` or at or after
+    ``handover_from``.  Returns plain, picklable data.
+    """
+    if report_from is None:
+        report_from = start_frame
+
+    # 1 ▸ Open a streaming frame source, decoded ahead on a background thread
+    source = video_utils.FrameSource(
+        video_path,
+        skip_frames=skip_frames,
+        sample_fps=video_cfg.sample_fps,
+        seek=video_cfg.seek_sampling,
+        frame_cache=frame_cache,
+        decoder=video_cfg.decoder,
+        threads=video_cfg.decoder_threads,
+        index=index,
+        start_frame=start_frame,
+        end_frame=end_frame,
+    )
+    scale = video_utils.FrameScale.fit(
+        (source.width, source.height), video_cfg.target_resolution
+    )
+    crop_detection = objdet_cfg.crop_detection and not objdet_cfg.motion_only
+    if frame_cache is None and not crop_detection:
+        # nothing needs full-size frames: let the decoder emit proxies
+        source.size = scale.proxy_size
+    reader = video_utils.PrefetchReader(source, depth=video_cfg.prefetch_depth)
+    region = RegionMask.from_config(camera_cfg, scale)
+
+    # min_area is given in source px²; express it in proxy px²
+    motion = MotionDetector(
+        dataclasses.replace(
+            motion_cfg, min_area=motion_cfg.min_area / scale.area_factor
+        )
+    )
+    primed = False
+    if background is not None:
+        w, h = scale.proxy_size if region is None else region.mask.shape[::-1]
+        shape = (h, w) if video_cfg.grayscale_motion else (h, w, 3)
+        if (
+            background.image.shape == shape
+            and background.algorithm == motion_cfg.algorithm
+        ):
+            motion.prime(background)
+            primed = True
+        else:
+            logger.warning("Saved background does not match the analysis frames")
+
+    if detector is None and not objdet_cfg.motion_only:
+        detector = ObjectDetector(objdet_cfg)
+    imgsz, batch_size = objdet_cfg.imgsz, objdet_cfg.batch_size
+    gate = DetectionGate(
+        # motion confined to excluded areas must not wake the detector
+        dataclasses.replace(objdet_cfg, motion_gating=True) if region else objdet_cfg
+    )
+    tracker = ObjectTracker(tracker_cfg)
+    timer = StageTimer()
+
+    timestamps: List[float] = []
+    motion_scores: List[float] = []
+    class_ids: Counter = Counter()       # detections per class ID, reported frames
+    tracked_history: Dict[int, List[Dict]] = {}
+    track_events: List[Event] = []
+    analyzer = EventAnalyzer(event_cfg) if event_cfg is not None else None
+
+    def collect(finished: Dict[int, List[Dict]]) -> None:
+        for obj_id, hist in finished.items():
+            if (
+                analyzer is None
+                or hist[0]["frame_idx"] < report_from
+                or (handover_from is not None and hist[-1]["frame_idx"] >= handover_from)
+            ):
+                tracked_history[obj_id] = hist
+            else:
+                track_events.extend(analyzer.track_events(obj_id, hist))
+
+    propagator = BoxPropagator(objdet_cfg)
+    pending: List[QueuedFrame] = []
+    queued = 0
+    last_det: Optional[DetectionBatch] = None
+    crop_frames = crop_count = 0
+
+    def detect_queued(items: List[QueuedFrame]) -> DetectionBatch:
+        """Detections of queued frames in detection-frame px, rows tagged by idx."""
+        full = [item for item in items if not isinstance(item.detect, MotionCrops)]
+        parts = [
+            detector.detect(
+                [item.detect for item in full], [item.idx for item in full], imgsz=imgsz
+            )
+        ]
+        cropped = [item for item in items if isinstance(item.detect, MotionCrops)]
+        if cropped:
+            # all crops of all queued frames in one call; rows tagged by crop
+            crop_det = detector.detect(
+                [image for item in cropped for image in item.detect.images],
+                imgsz=objdet_cfg.crop_imgsz,
+            )
+            first = 0
+            for item in cropped:
+                last = first + len(item.detect)
+                rows = crop_det.select((crop_det.frame_idx >= first) & (crop_det.frame_idx < last))
+                rows = item.detect.to_frame(
+                    dataclasses.replace(rows, frame_idx=rows.frame_idx - first),
+                    objdet_cfg.nms_threshold,
+                )
+                parts.append(
+                    dataclasses.replace(rows, frame_idx=np.full(len(rows), item.idx, np.int64))
+                )
+                first = last
+        return DetectionBatch.concat(parts, detector.names)
+
+    def to_source(local: DetectionBatch, idx: int) -> DetectionBatch:
+        """Detection-frame px -> source px, rows tagged with frame ``idx``."""
+        if region is not None:
+            local = region.batch_to_frame(local)
+        local = scale.batch_to_source(local)
+        return dataclasses.replace(local, frame_idx=np.full(len(local), idx, np.int64))
+
+    def flush() -> None:
+        """Detect on the queued frames in one batch, then track in order."""
+        nonlocal queued, last_det
+        to_detect = [item for item in pending if item.detect is not None]
+        if to_detect:
+            with timer("detection"):
+                batch = detect_queued(to_detect)
+
+        for pos, item in enumerate(pending):
+            # frames the gate skips reach the tracker as "not observed" (None)
+            frame_det: Optional[DetectionBatch] = None
+            local: Optional[DetectionBatch] = None
+            if item.blobs is not None:
+                local = item.blobs
+            elif item.detect is not None:
+                local = batch.for_frame(item.idx)
+            elif item.gray is not None:
+                with timer("propagation"):
+                    local = propagator.propagate(item.gray)
+                if local is None:
+                    # flow lost confidence: detect this frame after all
+                    later = pending[pos + 1:]
+                    restarted = any(
+                        i.detect is not None or (i.gray is None and not i.reuse) for i in later
+                    )
+                    gate.record_redetection(
+                        None if restarted else sum(i.gray is not None for i in later)
+                    )
+                    with timer("detection"):
+                        local = detector.detect([item.image], [item.idx], imgsz=imgsz)
+                    propagator.reset(item.gray, local)
+            if item.detect is not None and item.gray is not None:
+                propagator.reset(item.gray, local)
+
+            if local is not None:
+                frame_det = last_det = to_source(local, item.idx)
+            elif item.reuse and last_det is not None:
+                frame_det = dataclasses.replace(
+                    last_det, frame_idx=np.full(len(last_det), item.idx, np.int64)
+                )
+
+            with timer("tracking"):
+                tracker.update(frame_det, item.ts, item.idx)
+            collect(tracker.pop_finished())
+
+            if item.idx < report_from:
+                continue
+            timestamps.append(item.ts)
+            motion_scores.append(item.motion_score)
+            if frame_det is not None:
+                class_ids.update(frame_det.class_id.tolist())
+        pending.clear()
+        queued = 0
+
+    # 2-4 ▸ Motion detection per frame; detection batched; tracking in order
+    for idx, ts, frame in reader:
+        proxy = video_utils.make_proxy(frame, scale)
+
+        with timer("motion"):
+            motion_frame = (
+                video_utils.to_gray(proxy) if video_cfg.grayscale_motion else proxy
+            )
+            if region is None:
+                motion_score = motion.score_frame(motion_frame)
+            else:
+                motion_score = (
+                    motion.score_frame(region.masked(motion_frame))
+                    * region.score_factor
+                )
+
+        item = QueuedFrame(idx, ts, motion_score)
+        if objdet_cfg.motion_only:
+            item = item._replace(blobs=motion.blobs.to_batch(idx))
+        elif gate.should_detect(motion_score):
+            det_frame = proxy if region is None else region.crop(proxy)
+            gray = video_utils.to_gray(det_frame) if objdet_cfg.detect_interval > 1 else None
+            if gate.is_duplicate(det_frame):
+                item = item._replace(reuse=True)
+            elif gate.is_propagated():
+                item = item._replace(image=det_frame, gray=gray)
+            else:
+                detect: Union[np.ndarray, MotionCrops] = det_frame
+                if crop_detection:
+                    origin = np.array(region.box[:2] if region is not None else (0, 0))
+                    tracked = np.array(
+                        [obj["bbox"] for obj in tracker.objects.values()], np.float32
+                    ).reshape(-1, 4)
+                    crops = MotionCrops.plan(
+                        motion.blobs,
+                        det_frame.shape[1::-1],
+                        frame,
+                        objdet_cfg,
+                        origin=origin,
+                        factor=(
+                            frame.shape[1] / proxy.shape[1],
+                            frame.shape[0] / proxy.shape[0],
+                        ),
+                        # source px -> detection-frame px
+                        tracked=tracked / np.array([scale.sx, scale.sy] * 2)
+                        - np.tile(origin, 2),
+                    )
+                    if crops is not None:
+                        detect = crops
+                        crop_frames += 1
+                        crop_count += len(crops)
+                item = item._replace(detect=detect, image=det_frame, gray=gray)
+        pending.append(item)
+        if item.detect is not None or item.blobs is not None:
+            queued += 1
+            if queued >= batch_size:
+                flush()
+        if governor is not None:
+            step = governor.observe(ts)
+            if step is not None:
+                flush()
+                source.sample_fps = None
+                source.skip_frames = step.skip_frames
+                imgsz, batch_size = step.imgsz, step.batch_size
+    flush()
+    collect(tracker.finish())
+
+    names = detector.names if detector is not None else MOTION_NAMES
+    class_counts = {names[int(c)]: n for c, n in sorted(class_ids.items())}
+
+    return {
+        "fps": source.fps,
+        "timestamps": timestamps,
+        "motion_scores": motion_scores,
+        "tracked_history": tracked_history,
+        "track_events": track_events,
+        "class_counts": class_counts,
+        "decode": reader.stats,
+        "detection": {**gate.stats, "crop_frames": crop_frames, "crops": crop_count},
+        "analysed_area_fraction": round(region.area_fraction, 4) if region else 1.0,
+        "motion_primed": primed,
+        "stage_seconds": timer.report,
+        "background": motion.snapshot() if motion_cfg.background_dir else None,
+        "autotune": {**governor.step._asdict(), "adjustments": governor.adjustments}
+        if governor is not None
+        else None,
+    }
+
 
 def process_cctv_video(
     video_path: str,
     *,
+    video_cfg: VideoConfig = VideoConfig(),
+    camera_cfg: CameraConfig = CameraConfig(),
     motion_cfg: MotionDetectorConfig = MotionDetectorConfig(),
     objdet_cfg: ObjectDetectorConfig = ObjectDetectorConfig(),
     tracker_cfg: ObjectTrackerConfig = ObjectTrackerConfig(),
     event_cfg: EventAnalyzerConfig = EventAnalyzerConfig(),
     export_cfg: VideoExporterConfig = VideoExporterConfig(),
-    skip_frames: int = 2,
+    skip_frames: Optional[int] = None,
+    realtime_target: Optional[float] = None,
 ) -> Dict[str, Any]:
-    """End‑to‑end CCTV analysis pipeline."""
+    """End‑to‑end CCTV analysis pipeline.
+
+    Analysis runs on proxy frames shrunk to ``video_cfg.target_resolution``;
+    detections are mapped back to source pixels before tracking, so tracks,
+    speeds and events are always reported in source coordinates.
+    ``skip_frames`` overrides ``video_cfg.skip_frames`` when given.
+
+    ``camera_cfg`` regions restrict all analysis to the allowed area; with
+    regions configured, detection only runs on frames with motion inside
+    that area (see ``DetectionGate``).
+
+    With ``video_cfg.workers > 1`` the video is split at keyframes and the
+    chunks are analysed in separate processes (see :mod:`.parallel`); the
+    result has the same structure as a serial run.
+
+    With ``motion_cfg.background_dir`` set, motion detection starts from the
+    background saved for ``camera_cfg.name`` by the previous run, and the
+    background at the end of this run replaces it.
 
-    # 1 ▸ Extract frames & timestamps
-    frames, timestamps, fps = video_utils.extract_frames(
-        video_path, skip_frames=skip_frames
+    With a ``realtime_target`` (default ``video_cfg.realtime_target``) of
+    N, the sampling stride, detector input size and batch size are chosen
+    by timing short runs on the start of the video so that analysis runs
+    at N times real time or faster, and are lowered further during the
+    run if it falls behind (see :mod:`.autotune`).  The report's
+    ``autotune`` entry records the trials, the settings and the measured
+    throughput.
+    """
+    if skip_frames is None:
+        skip_frames = video_cfg.skip_frames
+
+    frame_cache = (
+        FrameCache(video_cfg.frame_cache_dir, int(video_cfg.frame_cache_max_gb * 1e9))
+        if video_cfg.frame_cache_dir
+        else None
     )
 
-    # 2 ▸ Motion detection
-    motion = MotionDetector(motion_cfg)
-    motion_data = motion.detect_motion(frames)
+    bg_path = (
+        background_path(motion_cfg.background_dir, camera_cfg.name)
+        if motion_cfg.background_dir
+        else None
+    )
 
-    # 3 ▸ Object detection
-    detector = ObjectDetector(objdet_cfg)
-    detections = detector.detect_objects(frames)
-    filtered = [
-        [d for d in frame_det if d["class"] in objdet_cfg.relevant_classes]
-        for frame_det in detections
-    ]
+    analysis_cfg = dict(
+        video_cfg=video_cfg,
+        camera_cfg=camera_cfg,
+        motion_cfg=motion_cfg,
+        objdet_cfg=objdet_cfg,
+        tracker_cfg=tracker_cfg,
+        skip_frames=skip_frames,
+        background=BackgroundModel.load(bg_path) if bg_path else None,
+    )
 
-    # 4 ▸ Object tracking
-    tracker = ObjectTracker(tracker_cfg)
-    tracked_history = defaultdict(list)
-    for idx, frame_det in enumerate(filtered):
-        tracks = tracker.track_objects([frame_det], timestamps[idx : idx + 1])
-        for obj_id, data in tracks.items():
-            tracked_history[obj_id].append(data)
+    if realtime_target is None:
+        realtime_target = video_cfg.realtime_target
+    autotune = None
+    detector = None
+    if realtime_target:
+        from .autotune import calibrate
+
+        # chunks run side by side, so each worker needs its share only
+        autotune = calibrate(video_path, realtime_target / video_cfg.workers, **analysis_cfg)
+        governor = autotune.pop("governor")
+        detector = autotune.pop("detector")
+        analysis_cfg.update(
+            video_cfg=dataclasses.replace(video_cfg, sample_fps=None),
+            objdet_cfg=dataclasses.replace(
+                objdet_cfg, imgsz=governor.step.imgsz, batch_size=governor.step.batch_size
+            ),
+            skip_frames=governor.step.skip_frames,
+            governor=governor,
+        )
+
+    t0 = time.perf_counter()
+    if video_cfg.workers > 1:
+        from .parallel import analyse_parallel
+
+        # chunks are cut at keyframes, which needs the index
+        index = load_or_build_index(video_path)
+        detector = None  # each worker loads its own; free the calibration copy
+        analysis = analyse_parallel(
+            video_path, frame_cache=frame_cache, index=index, event_cfg=event_cfg, **analysis_cfg
+        )
+    else:
+        index = (
+            load_or_build_index(video_path) if video_cfg.keyframe_index else None
+        )
+        analysis = analyse_range(
+            video_path,
+            frame_cache=frame_cache,
+            index=index,
+            detector=detector,
+            event_cfg=event_cfg,
+            **analysis_cfg,
+        )
+
+    analysis_seconds = time.perf_counter() - t0
+
+    if bg_path and analysis["background"] is not None:
+        analysis["background"].save(bg_path)
+
+    timestamps = analysis["timestamps"]
+    motion_data = MotionDetector(motion_cfg).summarize(analysis["motion_scores"])
 
     # 5 ▸ Event analysis
     analyzer = EventAnalyzer(event_cfg)
     events: List[Event] = analyzer.analyze_events(
-        motion_data, tracked_history, timestamps, fps
+        motion_data,
+        analysis["tracked_history"],
+        timestamps,
+        analysis["fps"],
+        track_events=analysis["track_events"],
     )
 
     # 6 ▸ Highlight export
-    exporter = VideoExporter(export_cfg)
+    exporter = VideoExporter(
+        export_cfg, frame_cache=frame_cache, decoder=video_cfg.decoder, index=index
+    )
     segments: List[VideoSegment] = exporter.create_highlights(
-        video_path, events, timestamps, "highlights"
+        video_path, events, timestamps, "highlights", fps=analysis["fps"]
     )
 
     report = {
         "total_video_duration": timestamps[-1] if timestamps else 0,
         "total_events": len(events),
         "highlight_count": len(segments),
-        "class_counts": detector.get_detection_summary(filtered)["class_counts"],
+        "class_counts": analysis["class_counts"],
+        "decode": analysis["decode"],
+        "detection": analysis["detection"],
+        "analysed_area_fraction": analysis["analysed_area_fraction"],
+        "motion_primed": analysis["motion_primed"],
+        "stage_seconds": analysis["stage_seconds"],
     }
+    if "parallel" in analysis:
+        report["parallel"] = analysis["parallel"]
+    if autotune is not None:
+        final = dict(analysis["autotune"])
+        report["autotune"] = {
+            **autotune,
+            "target": realtime_target,
+            "adjustments": final.pop("adjustments"),
+            "final": final,
+            "realtime_factor": round(report["total_video_duration"] / analysis_seconds, 2),
+        }
 
     return {"segments": segments, "events": events, "report": report}
 
@@ -88,10 +537,27 @@ if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Run CCTV video analysis")
     ap.add_argument("video", help="Path to source video file")
     ap.add_argument("-o", "--out", default="highlights", help="Output folder")
+    ap.add_argument("-c", "--config", help="YAML config, e.g. config/default_config.yaml")
+    ap.add_argument("--camera", help="Camera entry of the config's cameras: section")
+    ap.add_argument(
+        "--realtime-target", type=float, help="Autotune to analyse at least N x real time"
+    )
+    ap.add_argument(
+        "--motion-only", action="store_true", help="Track motion blobs; no object detector"
+    )
     ns = ap.parse_args()
+    if ns.camera and not ns.config:
+        ap.error("--camera needs --config")
 
     pathlib.Path(ns.out).mkdir(exist_ok=True)
-    results = process_cctv_video(ns.video)
+    cfg_kwargs = load_config(ns.config, camera=ns.camera) if ns.config else {}
+    if ns.motion_only:
+        cfg_kwargs["objdet_cfg"] = dataclasses.replace(
+            cfg_kwargs.get("objdet_cfg", ObjectDetectorConfig()), motion_only=True
+        )
+    results = process_cctv_video(
+        ns.video, realtime_target=ns.realtime_target, **cfg_kwargs
+    )
     (pathlib.Path(ns.out) / "summary.json").write_text(
         json.dumps(results["report"], indent=2)
     )
@@ -0,0 +1,82 @@
+"""Box IoU and NMS helpers against scalar references."""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.cctv_analyzer.core.geometry import batched_nms, iou_matrix, pair_iou
+
+
+def reference_iou(a, b) -> float:
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+CASES = {
+    "disjoint": ([0, 0, 10, 10], [20, 20, 30, 30], 0.0),
+    "touching": ([0, 0, 10, 10], [10, 0, 20, 10], 0.0),
+    "corner": ([0, 0, 10, 10], [10, 10, 20, 20], 0.0),
+    "nested": ([0, 0, 20, 20], [5, 5, 15, 15], 100 / 400),
+    "identical": ([3, 4, 13, 24], [3, 4, 13, 24], 1.0),
+    # the old tracker computed the second area as (x2 - x1) * (y2 - y2) = 0,
+    # which gave 25 / 75 here
+    "partial": ([0, 0, 10, 10], [5, 5, 15, 15], 25 / 175),
+    "degenerate": ([5, 5, 5, 5], [5, 5, 5, 5], 0.0),
+}
+
+
+@pytest.mark.parametrize("a, b, expected", CASES.values(), ids=CASES.keys())
+def test_known_cases(a, b, expected):
+    assert pair_iou(np.array(a), np.array(b)) == pytest.approx(expected)
+    assert iou_matrix([a], [b])[0, 0] == pytest.approx(expected)
+    assert reference_iou(a, b) == pytest.approx(expected)
+
+
+def test_symmetric():
+    a, b = CASES["partial"][:2]
+    assert pair_iou(np.array(a), np.array(b)) == pair_iou(np.array(b), np.array(a))
+
+
+def random_boxes(rng, n):
+    xy = rng.uniform(0, 200, (n, 2))
+    return np.concatenate([xy, xy + rng.uniform(0, 80, (n, 2))], axis=1)
+
+
+def test_iou_matrix_matches_reference():
+    rng = np.random.default_rng(0)
+    a, b = random_boxes(rng, 60), random_boxes(rng, 40)
+    expected = np.array([[reference_iou(x, y) for y in b] for x in a])
+    result = iou_matrix(a, b)
+    assert result.shape == (60, 40)
+    np.testing.assert_allclose(result, expected)
+
+
+def test_pair_iou_is_elementwise():
+    rng = np.random.default_rng(1)
+    a, b = random_boxes(rng, 50), random_boxes(rng, 50)
+    expected = [reference_iou(x, y) for x, y in zip(a, b)]
+    np.testing.assert_allclose(pair_iou(a, b), expected)
+    np.testing.assert_allclose(np.diag(iou_matrix(a, b)), expected)
+
+
+def test_empty_inputs():
+    assert iou_matrix(np.zeros((0, 4)), random_boxes(np.random.default_rng(2), 3)).shape == (0, 3)
+    assert iou_matrix([], []).shape == (0, 0)
+
+
+def test_batched_nms_fallback_matches_opencv(monkeypatch):
+    if not hasattr(cv2.dnn, "NMSBoxesBatched"):
+        pytest.skip("OpenCV < 4.7 has only the fallback")
+    rng = np.random.default_rng(3)
+    boxes = random_boxes(rng, 300)
+    xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1).astype(np.float32)
+    scores = rng.uniform(0, 1, 300).astype(np.float32)
+    class_ids = rng.integers(0, 5, 300)
+    batched = batched_nms(xywh, scores, class_ids, 0.2, 0.5)
+    monkeypatch.delattr(cv2.dnn, "NMSBoxesBatched")
+    np.testing.assert_array_equal(batched_nms(xywh, scores, class_ids, 0.2, 0.5), batched)